@@ -0,0 +1,297 @@
+import argparse
+import time
+
+import numpy as np
+
+from board import Ship_Classes
+from placement import check_fleet_fits
+
+def _placement_bits(height, width, length):
+    """
+    Every way a ship of this length fits, as (placements, words) uint64
+    bitmasks over the height * width cells (64 cells per word).
+    """
+    words = (height * width + 63) // 64
+    bits = []
+    for row in range(height):
+        for col in range(width):
+            shapes = []
+            if col + length <= width:
+                shapes.append([row * width + col + i for i in range(length)])
+            if length > 1 and row + length <= height:
+                shapes.append([(row + i) * width + col for i in range(length)])
+            for cells in shapes:
+                mask = [0] * words
+                for cell in cells:
+                    mask[cell // 64] |= 1 << (cell % 64)
+                bits.append(mask)
+    return np.array(bits, dtype=np.uint64)
+
+def _unpack(bits, cells):
+    """(n, words) uint64 bitmasks to an (n, cells) bool array"""
+    as_bytes = bits.astype('<u8').view(np.uint8).reshape(len(bits), -1)
+    return np.unpackbits(as_bytes, axis=1, bitorder='little')[:, :cells].astype(bool)
+
+# Valid layouts of the leading ships are enumerated up to this many combinations
+PREFIX_LIMIT = 1 << 16
+
+def _valid_prefixes(bits, lengths):
+    """
+    Every non-overlapping layout of the first few ships as (picks, occupied),
+    growing the prefix while the cross product stays under PREFIX_LIMIT.
+    """
+    picks = np.arange(len(bits[lengths[0]]))[:, None]
+    occupied = bits[lengths[0]]
+    for length in lengths[1:]:
+        options = len(bits[length])
+        if len(picks) * options > PREFIX_LIMIT:
+            break
+        pairs = np.arange(len(picks) * options)
+        first, second = np.divmod(pairs, options)
+        mask = bits[length][second]
+        fits = ~(occupied[first] & mask).any(axis=1)
+        picks = np.column_stack([picks[first[fits]], second[fits]])
+        occupied = occupied[first[fits]] | mask[fits]
+    return picks, occupied
+
+def place_fleets(games, height, width, fleet=None, rng=None):
+    """
+    Ship-id grids (games, height, width) for many games at once, 0 = water
+    and k = the k-th ship of the fleet.
+
+    This is the whole-layout rejection sampling of placement.solve_placement
+    done for every game in lockstep, so layouts are exactly uniform. The
+    leading ships are drawn from a table of their valid combinations rather
+    than independently, which only skips layouts that would have been
+    rejected anyway. Like that sampler it suits roomy fleets, dense fleets
+    should go through the solver instead.
+    """
+    fleet = fleet or Ship_Classes
+    rng = rng or np.random.default_rng()
+    check_fleet_fits(height, width, fleet)
+    lengths = list(fleet.values())
+    bits = {length: _placement_bits(height, width, length) for length in set(lengths)}
+    prefix_picks, prefix_occupied = _valid_prefixes(bits, lengths)
+
+    chosen = np.zeros((games, len(lengths)), dtype=np.int64)
+    pending = np.arange(games)
+    while len(pending):
+        prefix = rng.integers(0, len(prefix_picks), size=len(pending))
+        chosen[pending, :prefix_picks.shape[1]] = prefix_picks[prefix]
+        occupied = prefix_occupied[prefix]
+        fits = np.ones(len(pending), dtype=bool)
+        for ship in range(prefix_picks.shape[1], len(lengths)):
+            length = lengths[ship]
+            picks = rng.integers(0, len(bits[length]), size=len(pending))
+            chosen[pending, ship] = picks
+            mask = bits[length][picks]
+            fits &= ~(occupied & mask).any(axis=1)
+            occupied |= mask
+        pending = pending[~fits]  # Redraw every layout that overlapped, prefix included
+
+    cells = height * width
+    ship_ids = np.zeros((games, cells), dtype=np.int8)
+    for ship, length in enumerate(lengths):
+        ship_ids[_unpack(bits[length][chosen[:, ship]], cells)] = ship + 1
+    return ship_ids.reshape(games, height, width)
+
+# Draws a sequentially placed ship may take before its whole layout is started over
+SEQUENTIAL_RETRIES = 1000
+
+def place_fleets_sequential(games, height, width, fleet=None, rng=None):
+    """
+    The placement Board.place_ships_random used before it became uniform:
+    ships go down one at a time in fleet order, each redrawing a random
+    row, column and orientation until it fits around the ships already
+    placed. Kept to measure how far from uniform that is.
+
+    The original could loop forever once earlier ships left no room for a
+    later one, here such a layout is started over after SEQUENTIAL_RETRIES
+    draws.
+    """
+    fleet = fleet or Ship_Classes
+    rng = rng or np.random.default_rng()
+    check_fleet_fits(height, width, fleet)
+    lengths = list(fleet.values())
+    cells = height * width
+    bits = {}
+    lookup = {}  # (row, col, vertical) -> placement index into bits, -1 when out of bounds
+    for length in set(lengths):
+        bits[length] = _placement_bits(height, width, length)
+        table = np.full((height, width, 2), -1, dtype=np.int64)
+        index = 0
+        for row in range(height):
+            for col in range(width):
+                if col + length <= width:
+                    table[row, col, 0] = index
+                    index += 1
+                if length > 1 and row + length <= height:
+                    table[row, col, 1] = index
+                    index += 1
+                elif length == 1:
+                    table[row, col, 1] = table[row, col, 0]
+        lookup[length] = table.reshape(-1)
+
+    chosen = np.zeros((games, len(lengths)), dtype=np.int64)
+    pending = np.arange(games)
+    while len(pending):
+        occupied = np.zeros((len(pending), bits[lengths[0]].shape[1]), dtype=np.uint64)
+        stuck = np.zeros(len(pending), dtype=bool)
+        for ship, length in enumerate(lengths):
+            waiting = np.flatnonzero(~stuck)
+            for _ in range(SEQUENTIAL_RETRIES):
+                if not len(waiting):
+                    break
+                picks = lookup[length][rng.integers(0, cells * 2, size=len(waiting))]
+                mask = bits[length][picks]
+                fits = (picks >= 0) & ~(occupied[waiting] & mask).any(axis=1)
+                placed = waiting[fits]
+                chosen[pending[placed], ship] = picks[fits]
+                occupied[placed] |= mask[fits]
+                waiting = waiting[~fits]
+            stuck[waiting] = True
+        pending = pending[stuck]
+
+    ship_ids = np.zeros((games, cells), dtype=np.int8)
+    for ship, length in enumerate(lengths):
+        ship_ids[_unpack(bits[length][chosen[:, ship]], cells)] = ship + 1
+    return ship_ids.reshape(games, height, width)
+
+# Per-cell shot states
+UNKNOWN, MISS, HIT, SUNK = 0, 1, 2, 3
+
+class BatchGames:
+    """
+    G games held as stacked arrays and advanced one turn per vectorized step.
+
+    ships holds each game's ship ids and state what has been fired at
+    (MISS, HIT, or SUNK once the whole ship is down). With record_turns,
+    fired_at keeps the turn each cell was fired at (-1 while it hasn't
+    been), which costs a little speed. Every active game
+    fires once per step, so a game's shot count is the turn it finished
+    on. Finished games are masked out of every later step.
+    """
+
+    def __init__(self, ship_ids, record_turns=False):
+        self.games, self.height, self.width = ship_ids.shape
+        self.cells = self.height * self.width
+        self.ships = ship_ids.reshape(self.games, -1)
+        self.state = np.zeros(self.ships.shape, dtype=np.int8)
+        self.fired_at = np.full(self.ships.shape, -1, dtype=np.int16) if record_turns else None
+        fleet_size = int(self.ships.max()) + 1
+        self.afloat = np.stack([np.count_nonzero(self.ships == ship, axis=1) for ship in range(fleet_size)], axis=1).astype(np.int16)
+        self.afloat[:, 0] = 0  # Water never sinks
+        self.remaining = self.afloat.sum(axis=1, dtype=np.int16)  # Ship cells still afloat per game
+        self.shots = np.zeros(self.games, dtype=np.int16)
+        self.turn = 0
+        self.active = np.flatnonzero(self.remaining)
+
+    def step(self, cells):
+        """Fire at cells[i] in the i-th still-active game"""
+        games = self.active
+        flat = games * self.cells + cells  # Index into the flattened (games, cells) arrays
+        ship = self.ships.ravel()[flat]
+        hit = ship != 0
+        self.state.ravel()[flat] = np.where(hit, HIT, MISS)
+        if self.fired_at is not None:
+            self.fired_at.ravel()[flat] = self.turn
+        self.turn += 1
+
+        hit_games, hit_ships = games[hit], ship[hit]
+        slot = hit_games * self.afloat.shape[1] + hit_ships
+        afloat = self.afloat.ravel()
+        afloat[slot] -= 1
+        sunk = afloat[slot] == 0
+        if sunk.any():
+            sunk_games = hit_games[sunk]
+            sunk_cells = self.ships[sunk_games] == hit_ships[sunk][:, None]
+            self.state[sunk_games] = np.where(sunk_cells, SUNK, self.state[sunk_games])
+
+            # Only a sinking can finish a game
+            self.remaining[hit_games] -= 1
+            finished = sunk_games[self.remaining[sunk_games] == 0]
+            if len(finished):
+                self.shots[finished] = self.turn
+                self.active = games[self.remaining[games] > 0]
+        else:
+            self.remaining[hit_games] -= 1
+
+    def run(self, strategy):
+        """Play every game to the end, returns the shots each one took"""
+        while len(self.active):
+            self.step(strategy.choose(self))
+        return self.shots
+
+# Strategies that can be vectorized: choose(batch) returns a cell for every active game
+
+class RandomBatchStrategy:
+    """PseudoAI's original targeting: a uniformly random cell not fired at yet"""
+
+    def __init__(self, games, height, width, rng):
+        self.order = np.argsort(rng.random((games, height * width), dtype=np.float32), axis=1)
+
+    def choose(self, batch):
+        return self.order[batch.active, batch.turn]
+
+class HuntTargetBatchStrategy:
+    """
+    Vectorized hunt/target: fire next to hits on ships that aren't sunk yet,
+    otherwise hunt on the checkerboard, ties broken by a random per-game
+    cell ranking. Close to strategies.HuntTargetStrategy without its
+    axis tracking and parity changes.
+    """
+
+    def __init__(self, games, height, width, rng):
+        self.height, self.width = height, width
+        cells = height * width
+        rank = np.argsort(np.argsort(rng.random((games, cells), dtype=np.float32), axis=1), axis=1)
+        rows, cols = np.divmod(np.arange(cells), width)
+        self.hunt_score = (rank + np.where((rows + cols) % 2 == 0, cells, 0)).astype(np.int16)
+
+    def choose(self, batch):
+        games = batch.active
+        cells = self.height * self.width
+        state = batch.state[games]
+        wounded = (state == HIT).reshape(-1, self.height, self.width)
+        adjacent = np.zeros_like(wounded)
+        adjacent[:, 1:, :] |= wounded[:, :-1, :]
+        adjacent[:, :-1, :] |= wounded[:, 1:, :]
+        adjacent[:, :, 1:] |= wounded[:, :, :-1]
+        adjacent[:, :, :-1] |= wounded[:, :, 1:]
+
+        score = self.hunt_score[games]
+        score += adjacent.reshape(-1, cells) * np.int16(2 * cells)
+        score[state != UNKNOWN] = -1
+        return score.argmax(axis=1)
+
+BATCH_STRATEGIES = {'random': RandomBatchStrategy, 'hunt_target': HuntTargetBatchStrategy}
+
+# Games per batch, small enough that one step's arrays stay in cache
+CHUNK_GAMES = 16384
+
+def simulate(games, size, strategy='random', seed=None, fleet=None):
+    """Shots needed to sink the fleet in each of `games` games"""
+    rng = np.random.default_rng(seed)
+    shots = np.zeros(games, dtype=np.int16)
+    for start in range(0, games, CHUNK_GAMES):
+        count = min(CHUNK_GAMES, games - start)
+        batch = BatchGames(place_fleets(count, size, size, fleet, rng))
+        shots[start:start + count] = batch.run(BATCH_STRATEGIES[strategy](count, size, size, rng))
+    return shots
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Simulate many games at once with vectorized strategies")
+    parser.add_argument('--games', type=int, default=200_000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--strategies', nargs='+', default=list(BATCH_STRATEGIES))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for strategy in args.strategies:
+            start = time.perf_counter()
+            shots = simulate(args.games, size, strategy, args.seed)
+            elapsed = time.perf_counter() - start
+            print(f"{size}x{size} {strategy:<11} mean {shots.mean():6.2f} shots   "
+                  f"{args.games / elapsed:>10,.0f} games/sec")
@@ -1,19 +1,31 @@
+import copy
 import numpy as np
 import os
-import random
-import shutil
+import threading
 import time
 import traceback
+from collections import deque
+
+from events import EventBus, Shot, Hit, Sunk, GameOver, emit
+from placement import load_fleet, solve_placement
+from render import render_side_by_side
 
 Ship_Classes = {'Carrier':5, 'Battleship':4,'Cruiser':3,'Submarine':3, 'Destroyer':2}
 Ship_Letters = {'Carrier':'C', 'Battleship':'B','Cruiser':'R','Submarine':'S', 'Destroyer':'D'}
 
+# A custom fleet can be configured in fleet.json (or the file named by BATTLESHIP_FLEET)
+FLEET_CONFIG = os.environ.get('BATTLESHIP_FLEET', 'fleet.json')
+if os.path.exists(FLEET_CONFIG):
+    Ship_Classes, Ship_Letters = load_fleet(FLEET_CONFIG)
+
+MESSAGE_HISTORY = 2  # Shot messages kept on screen during a game
+
 class Board:
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.grid = np.zeros((width, height), dtype=str)
+        self.grid = np.zeros((height, width), dtype=str)
         self.grid[:] = ' '
         self.ship_positions = {ship: [] for ship in Ship_Classes}
         self.ships_sunk = 0
@@ -40,37 +52,21 @@ class Board:
 
         return True
 
-    def place_ships_random(self, num_ships=len(Ship_Classes)):
-        placed_ships = 0
-        ship_list = list(Ship_Classes.items())
-
-        while placed_ships < num_ships:
-            ship_name, length = ship_list[placed_ships]
+    def place_ships_random(self, num_ships=None):
+        """Places the first num_ships ships of the fleet (all of them by default)"""
+        fleet = dict(list(Ship_Classes.items())[:num_ships])
+        for ship_name, positions in solve_placement(self.height, self.width, fleet).items():
             ship_letter = Ship_Letters[ship_name]
-
-            row = np.random.randint(0, self.height)
-            col = np.random.randint(0, self.width)
-
-            # Vertical or horizontal
-            vert_or_horizontal = np.random.choice([0, 1])
-
-            if vert_or_horizontal == 1:  # Vertical Placements
-                if self.is_valid_placement(row, col, length, True):
-                    for i in range(length):
-                        self.grid[row + i, col] = ship_letter
-                        self.ship_positions[ship_name].append((row + i, col))
-                    placed_ships += 1
-            else:  # Horizontal Placement
-                if self.is_valid_placement(row, col, length, False):
-                    for i in range(length):
-                        self.grid[row, col + i] = ship_letter
-                        self.ship_positions[ship_name].append((row, col + i))
-                    placed_ships += 1
+            for row, col in positions:
+                self.grid[row, col] = ship_letter
+            self.ship_positions[ship_name] = positions
 
 class TargetingSystem:
 
-    def __init__(self, board: Board):
+    def __init__(self, board: Board, bus=None, shooter='Player'):
         self.board = board
+        self.bus = bus  # Optional EventBus, the rules never print
+        self.shooter = shooter
         self.hits = set()  # Keep track of hit positions
         self.misses = set()  # Keep track of miss positions
         self.game_over = False  # Track if the game is over
@@ -89,41 +85,45 @@ class TargetingSystem:
         if self.game_over:
             return False, "Game over! All ships have been sunk."
 
-        row, col = self.convert_input(target)
         try:
+            row, col = self.convert_input(target)
             if row < 0 or col < 0:
                 raise ValueError
 
             if (row, col) in self.hits or (row, col) in self.misses:
                 return False, "Already targeted this position!"
 
-            if self.board.grid[row, col] != ' ':  # Hit
+            if self.board.grid[row, col] != ' ' and self.board.grid[row, col] not in ['X', 'O']:  # Hit
                 ship_letter = self.board.grid[row, col]
                 self.hits.add((row, col))
                 self.board.grid[row, col] = 'X'
                 ship_name = [key for key, value in Ship_Letters.items() if value == ship_letter][0]
                 message = (f"\n <<< SHIP HIT! >>>\nYou hit opponent's {ship_name} at {letter_to_row[row]}{col + 1}.")
+                emit(self.bus, Shot, self.shooter, (row, col), True)
+                emit(self.bus, Hit, self.shooter, (row, col), ship_name)
                 self.check_if_ship_sunk(ship_letter)
                 return True, message
             else:  # Miss
                 self.misses.add((row, col))
                 self.board.grid[row, col] = 'O'
                 message = (f"\n <<< MISS! >>>\nNo ship at {target}.")
+                emit(self.bus, Shot, self.shooter, (row, col), False)
                 return True, message
 
         except Exception as e:
             return False, f"You can't shoot there. {e}"
 
     def check_if_ship_sunk(self, ship_letter):
-        # Check if ship has been fully sunk
+        # Check if ship has been fully sunk, returns its name if it was
         for ship_name, positions in self.board.ship_positions.items():
             if Ship_Letters[ship_name] == ship_letter:
                 # Check if all positions have been hit
                 if all(self.board.grid[row, col] == 'X' for row, col in positions):
-                    print(f"You have sunk opponent's {ship_name}!")
+                    emit(self.bus, Sunk, self.shooter, ship_name, positions)
                     self.board.ships_sunk += 1
                     self.check_if_all_ships_sunk()
-                return
+                    return ship_name
+                return None
 
     def check_if_all_ships_sunk(self):
         # Check if all ships have been sunk and end the game
@@ -132,24 +132,51 @@ class TargetingSystem:
             return "All ships have been sunk! You win!"
 
 class PseudoAI:
-    def __init__(self, board: Board, opponent_board: Board):
+    def __init__(self, board: Board, opponent_board: Board, strategy=None, move_budget=None, bus=None):
         self.board = board
         self.opponent_board = opponent_board
+        self.bus = bus  # Optional EventBus, the rules never print
+        self.shooter = 'AI'
+        if strategy is None:
+            from strategies import RandomStrategy  # strategies imports this module
+            strategy = RandomStrategy(opponent_board.height, opponent_board.width)
+        self.strategy = strategy
+        self.move_budget = move_budget  # Seconds the strategy may think per move, None = no limit
+        self.move_times = []  # How long each decision took, in seconds
+        self.move_waits = []  # How long fire() was held up by it (less when it was speculated)
         self.hits = set()
         self.misses = set()
         self.tries = 0
+        self.shot_log = []  # Cells fired at, in order (used by save/resume)
         self.remaining_targets = set((row, col) for row in range(self.opponent_board.height) for col in range(self.opponent_board.width))
         self.game_over = False
 
     def random_fire(self):
-        """Randomly picks a coordinate to fire without repeating"""
+        """Kept for callers of the original API, the strategy now picks the cell"""
+        return self.fire()
+
+    def fire(self, speculation=None):
+        """
+        Fires at the cell chosen by the strategy and reports the outcome back to it.
+        With a SpeculativeMove the decision made in the background is used instead.
+        """
         letter_to_row = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
         if not self.remaining_targets:
             return "No remaining targets for AI to fire at."
 
-        row, col = random.choice(list(self.remaining_targets))
+        decision_start = time.perf_counter()
+        cell = speculation.result() if speculation else None
+        if cell is not None:
+            self.strategy = speculation.strategy  # The copy that made the decision, its state is now the real one
+            self.move_times.append(speculation.thinking_time)
+        else:
+            cell = self.strategy.decide(self.move_budget)
+            self.move_times.append(time.perf_counter() - decision_start)
+        self.move_waits.append(time.perf_counter() - decision_start)
+        row, col = cell
         self.remaining_targets.remove((row, col))
+        self.shot_log.append((row, col))
 
         if self.opponent_board.grid[row, col] != ' ' and self.opponent_board.grid[row, col] != 'X' and self.opponent_board.grid[row, col] != 'O':
             # Hit
@@ -158,26 +185,33 @@ class PseudoAI:
             self.opponent_board.grid[row, col] = 'X'
             ship_name = [key for key, value in Ship_Letters.items() if value == ship_letter][0]
             message = (f"\n <<< SHIP HIT! >>>\nAI hits your {ship_name} at {letter_to_row[row]}{col + 1}.")
-            self.check_if_ship_sunk(ship_letter)  # Check if the ship is sunk
+            emit(self.bus, Shot, self.shooter, (row, col), True)
+            emit(self.bus, Hit, self.shooter, (row, col), ship_name)
+            sunk_ship = self.check_if_ship_sunk(ship_letter)  # Check if the ship is sunk
+            sunk = (sunk_ship, self.opponent_board.ship_positions[sunk_ship]) if sunk_ship else None
+            self.strategy.observe((row, col), True, sunk)
         else:
             # Miss
             self.misses.add((row, col))
             self.opponent_board.grid[row, col] = 'O'
             message = (f"\n <<< MISS! >>>\nAI misses at {letter_to_row[row]}{col + 1}.")
+            emit(self.bus, Shot, self.shooter, (row, col), False)
+            self.strategy.observe((row, col), False)
 
         self.tries += 1  # Increment AI's tries
         return message
 
     def check_if_ship_sunk(self, ship_letter):
-        # Check if ship has been fully sunk
+        # Check if ship has been fully sunk, returns its name if it was
         for ship_name, positions in self.opponent_board.ship_positions.items():
             if Ship_Letters[ship_name] == ship_letter:
                 # Check if all positions have been hit
                 if all(self.opponent_board.grid[row, col] == 'X' for row, col in positions):
-                    print(f"AI has sunk your {ship_name}!")
+                    emit(self.bus, Sunk, self.shooter, ship_name, positions)
                     self.opponent_board.ships_sunk += 1
                     self.check_if_all_ships_sunk()
-                return
+                    return ship_name
+                return None
 
     def check_if_all_ships_sunk(self):
         # Check if all player's ships have been sunk
@@ -186,32 +220,7 @@ class PseudoAI:
 
 def display_side_by_side(user_board: Board, ai_board: Board, hide_ships=False):
     """Display boards side by side"""
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-
-    # Getting terminal size
-    terminal_size = shutil.get_terminal_size((80, 20))
-    terminal_width = terminal_size.columns
-
-    # Prepare content
-    board_width = 5 * (user_board.width + ai_board.width + 5)  # Approximate width of both boards with padding
-    side_padding = max((terminal_width - board_width) // 2, 0)  # Calculate left/right padding
-
-    print(" " * side_padding + " "*(3*user_board.width//2 + 1) +"YOUR BOARD"+ " " * ((3*user_board.width//2 + 12) + (3* ai_board.width//2 -4))  + "OPPONENT'S BOARD")
-    print(" " * side_padding + "    " + " ".join(f"{i + 1:^3}" for i in range(user_board.height)) + " " * 10 + "     " + " ".join(f"{i + 1:^3}" for i in range(ai_board.height)))
-    print(" " * side_padding + "   +" + "---+" * user_board.width + " " * 10 + "   +" + "---+" * ai_board.width)
-
-    for row_num in range(user_board.height):
-        user_row_content = "|".join(f"{str(cell):^3}" for cell in user_board.grid[row_num])
-        ai_row_content = "|".join(f"{str(cell):^3}" for cell in ai_board.grid[row_num])
-
-        # Hiding ships
-        if hide_ships:
-            user_row_content = "|".join(f"{str(cell) if cell in ['X', 'O'] else ' ':^3}" for cell in user_board.grid[row_num])
-            ai_row_content = "|".join(f"{str(cell) if cell in ['X', 'O'] else ' ':^3}" for cell in ai_board.grid[row_num])
-
-        # Print content with padding
-        print(f"{' ' * side_padding}{alphabet[row_num]:^2} |{user_row_content}| {' ' * 10}{alphabet[row_num]:^2}|{ai_row_content}|")
-        print(" " * side_padding + "   +" + "---+" * user_board.width + " " * 10 + "   +" + "---+" * ai_board.width)
+    print(render_side_by_side(user_board.grid, ai_board.grid, "YOUR BOARD", "OPPONENT'S BOARD", hide_ships, hide_ships))
 
 def format_time(seconds):
     """HH:MM:SS"""
@@ -220,25 +229,86 @@ def format_time(seconds):
     minutes, seconds = divmod(remainder, 60)
     return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
 
-def game_loop(user_board, ai_board, targeting_system, ai):
-    """Main game loop"""
+def sunk_message(event):
+    if event.shooter == 'Player':
+        return f"You have sunk opponent's {event.ship}!"
+    return f"{event.shooter} has sunk your {event.ship}!"
+
+class SpeculativeMove:
+    """
+    The AI's next decision, worked out on a background thread while the
+    player is still typing their shot.
+
+    The AI only learns from its own shots, so how the player's shot lands
+    can't change its move. The one outcome that matters is the player
+    winning, then the AI never moves and the speculation is discarded.
+    The thread thinks on a deep copy of the strategy, so the live one is
+    never touched from two threads, and PseudoAI.fire() swaps the copy in
+    when it uses the result.
+    """
+
+    def __init__(self, ai):
+        self.strategy = copy.deepcopy(ai.strategy)
+        self.budget = ai.move_budget
+        self.cell = None
+        self.thinking_time = 0.0  # How long decide() took on the thread, in seconds
+        self.thread = threading.Thread(target=self._think, name="ai-speculation", daemon=True)
+        self.thread.start()
+
+    def _think(self):
+        start = time.perf_counter()
+        try:
+            self.cell = self.strategy.decide(self.budget)
+        except Exception:
+            self.cell = None  # fire() decides again on the live strategy and hits the error there
+        self.thinking_time = time.perf_counter() - start
+
+    def result(self):
+        """The speculated cell, waiting for the thread if it is still thinking (None if it failed)"""
+        self.thread.join()
+        return self.cell
+
+    def discard(self):
+        # Let it finish so no two searches share a strategy's caches (e.g. the endgame table) at once
+        self.thread.join()
+
+def game_loop(user_board, ai_board, targeting_system, ai, save_path=None, player_tries=0, elapsed_offset=0.0, bus=None):
+    """
+    Main game loop
+
+    If save_path is given the game is autosaved after every turn, and
+    quitting with 'q' keeps the save so the game can be resumed later.
+    player_tries and elapsed_offset carry over the state of a resumed game.
+    Shot/Hit/Sunk/GameOver events go to bus, so callers can subscribe
+    their own observers (history, stats, logging) to it.
+    """
+    from snapshot import save_snapshot, delete_snapshot
 
     user_input = ' '
     elapsed_time = 0
     end_early = False
-    start_time = time.time()
-    messages = []  # List to store messages
-    player_tries = 0  # Initialize player's number of tries
+    start_time = time.time() - elapsed_offset
+    messages = deque(maxlen=MESSAGE_HISTORY)  # Only the latest messages are kept
+
+    bus = bus or EventBus()
+    targeting_system.bus = bus
+    ai.bus = bus
+    # The screen shows a sink under the message of the shot that caused it
+    bus.subscribe(Sunk, lambda event: messages.append(messages.pop() + "\n" + sunk_message(event)))
     winner = None
     loser = None
+    speculation = None  # The AI's next move, thought out while the player types
 
     while True:
         try:
+            if speculation is None and not ai.game_over:
+                speculation = SpeculativeMove(ai)
+
             Board.clear_terminal()
             display_side_by_side(user_board, ai_board, hide_ships=True)
             print(f"Shot Count : {player_tries}")
             # Print the last few messages
-            for msg in messages[-2:]:
+            for msg in messages:
                 print(msg)
 
             # Input validation loop
@@ -249,6 +319,8 @@ def game_loop(user_board, ai_board, targeting_system, ai):
                     end_early = True
                     end_time = time.time()
                     elapsed_time = end_time - start_time
+                    if save_path:
+                        save_snapshot(save_path, user_board, ai_board, ai, player_tries, elapsed_time)
                     Board.clear_terminal()
                     print(f"Try Count : {player_tries}")
                     print(format_time(elapsed_time))
@@ -276,6 +348,7 @@ def game_loop(user_board, ai_board, targeting_system, ai):
             success, message = targeting_system.fire(user_input)
             if message:
                 messages.append(message)
+            bus.dispatch()
 
             if not success:
                 # If the shot was invalid (e.g., already targeted), re-prompt without proceeding
@@ -291,9 +364,11 @@ def game_loop(user_board, ai_board, targeting_system, ai):
                 break
 
             # AI takes a shot
-            ai_message = ai.random_fire()
+            ai_message = ai.fire(speculation)
+            speculation = None
             if ai_message:
                 messages.append(ai_message)
+            bus.dispatch()
 
             # Check if AI has won
             if ai.game_over:
@@ -302,6 +377,9 @@ def game_loop(user_board, ai_board, targeting_system, ai):
                 elapsed_time = time.time() - start_time
                 break
 
+            # Autosave after every full turn
+            if save_path:
+                save_snapshot(save_path, user_board, ai_board, ai, player_tries, time.time() - start_time)
 
 
         except Exception as e:
@@ -313,6 +391,9 @@ def game_loop(user_board, ai_board, targeting_system, ai):
                 print(f"File: {frame.filename}, Line: {frame.lineno}, Function: {frame.name}")
             break  # End the game due to an error
 
+    if speculation:
+        speculation.discard()  # The game ended before the AI's turn came
+
     # Game ended, display summary
     Board.clear_terminal()
     display_side_by_side(user_board, ai_board, hide_ships=False)
@@ -320,13 +401,22 @@ def game_loop(user_board, ai_board, targeting_system, ai):
     print(f"Player's Number of Shots: {player_tries}")
     print(f"AI's Number of Shots: {ai.tries}")
 
+    if winner and save_path:
+        delete_snapshot(save_path)  # A finished game can't be resumed
+
     if end_early:
         print("\nGame ended early by the player.")
+        if save_path:
+            print("Your game has been saved. Start the same difficulty with the same username to resume it.")
     elif winner:
         print(f"\nGame Over! {winner} has sunk all {loser}'s ships!")
     else:
         print("\nGame Over!")
 
+    if winner:
+        bus.emit(GameOver, winner, loser, format_time(elapsed_time), player_tries)
+        bus.dispatch()
+
     return [winner, loser, format_time(elapsed_time), player_tries]
 
 if __name__ == "__main__":
@@ -1,169 +1,19 @@
-import numpy as np
-import os
 import time
-import shutil
 import traceback
+from collections import deque
 
-Ship_Classes = {'Carrier': 5, 'Battleship': 4, 'Cruiser': 3, 'Submarine': 3, 'Destroyer': 2}
-Ship_Letters = {'Carrier': 'C', 'Battleship': 'B', 'Cruiser': 'R', 'Submarine': 'S', 'Destroyer': 'D'}
-
-class Board:
-
-    def __init__(self, width: int, height: int):
-        self.width = width
-        self.height = height
-        self.grid = np.zeros((height, width), dtype=str)
-        self.grid[:] = ' '
-        self.ship_positions = {ship: [] for ship in Ship_Classes}
-        self.ships_sunk = 0
-
-    @staticmethod
-    def clear_terminal():
-        os.system('cls' if os.name == 'nt' else 'clear')
-
-    def is_valid_placement(self, row, col, length, vertical):
-
-        if vertical:
-            if row + length > self.height:
-                return False  # Ship would go out of bounds
-            for i in range(length):
-                if self.grid[row + i, col] != ' ':
-                    return False  # Ship would overlap
-
-        else:
-            if col + length > self.width:
-                return False  # Ship would go out of bounds
-            for i in range(length):
-                if self.grid[row, col + i] != ' ':
-                    return False  # Ship would overlap
-
-        return True
-
-    def place_ships_random(self, num_ships=len(Ship_Classes)):
-        placed_ships = 0
-        ship_list = list(Ship_Classes.items())
-
-        while placed_ships < num_ships:
-            ship_name, length = ship_list[placed_ships]
-            ship_letter = Ship_Letters[ship_name]
-
-            row = np.random.randint(0, self.height)
-            col = np.random.randint(0, self.width)
-
-            # Vertical or horizontal placements
-            vert_or_horizontal = np.random.choice([0, 1])
-
-            if vert_or_horizontal == 1:  # Vertical placements
-                if self.is_valid_placement(row, col, length, True):
-                    for i in range(length):
-                        self.grid[row + i, col] = ship_letter
-                        self.ship_positions[ship_name].append((row + i, col))
-                    placed_ships += 1
-            else:  # Horizontal placement
-                if self.is_valid_placement(row, col, length, False):
-                    for i in range(length):
-                        self.grid[row, col + i] = ship_letter
-                        self.ship_positions[ship_name].append((row, col + i))
-                    placed_ships += 1
-
-
-class TargetingSystem:
-
-    def __init__(self, board: Board):
-        self.board = board
-        self.hits = set()  # Keep track of hit positions
-        self.misses = set()  # Keep track of miss positions
-        self.game_over = False  # Track if the game is over
-
-    def convert_input(self, target: str):
-        # Converting target like 'A1' to row and column indices
-        letter_to_row = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        row = letter_to_row.index(target[0].upper())  # Convert letter to row index
-        col = int(target[1:]) - 1
-        return row, col
-
-    def fire(self, target: str):
-        # Fire at a coordinate given as 'A1', 'B2', etc
-        letter_to_row = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-
-        if self.game_over:
-            return False, "Game over! All ships have been sunk."
-
-        try:
-            row, col = self.convert_input(target)
-            if row < 0 or col < 0:
-                raise ValueError
-
-            if (row, col) in self.hits or (row, col) in self.misses:
-                return False, "Already targeted this position!"
-
-            if self.board.grid[row, col] != ' ' and self.board.grid[row, col] not in ['X', 'O']:  # Hit
-                ship_letter = self.board.grid[row, col]
-                self.hits.add((row, col))
-                self.board.grid[row, col] = 'X'
-                ship_name = [key for key, value in Ship_Letters.items() if value == ship_letter][0]
-                message = (f"\n <<< SHIP HIT! >>>\nYou hit opponent's {ship_name} at {letter_to_row[row]}{col + 1}.")
-                self.check_if_ship_sunk(ship_letter)
-                return True, message
-            else:  # Miss
-                self.misses.add((row, col))
-                self.board.grid[row, col] = 'O'
-                message = (f"\n <<< MISS! >>>\nNo ship at {target}.")
-                return True, message
-
-        except Exception as e:
-            return False, f"You can't shoot there. {e}"
-
-    def check_if_ship_sunk(self, ship_letter):
-        # Check if ship has been fully sunk
-        for ship_name, positions in self.board.ship_positions.items():
-            if Ship_Letters[ship_name] == ship_letter:
-                # Check if all positions have been hit
-                if all(self.board.grid[row, col] == 'X' for row, col in positions):
-                    print(f"You have sunk opponent's {ship_name}!")
-                    self.board.ships_sunk += 1
-                    self.check_if_all_ships_sunk()
-                return
-
-    def check_if_all_ships_sunk(self):
-        # Check if all ships have been sunk and end the game
-        if self.board.ships_sunk == len(Ship_Classes):
-            self.game_over = True
-            return "All ships have been sunk! You win!"
+# The rules are shared with singleplayer, only the two-player loop lives here
+from board import Board, TargetingSystem, Ship_Classes, MESSAGE_HISTORY
+from board_pool import get_board_pool, log_pool_stats
+from events import EventBus, GameOver, Sunk
+from placement import check_fleet_fits
+from render import render_side_by_side
 
 def display_side_by_side(board1: Board, board2: Board, player_names, current_player_index):
     """Display boards side by side with boards in fixed positions"""
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-
-    # Getting terminal size
-    terminal_size = shutil.get_terminal_size((80, 20))
-    terminal_width = terminal_size.columns
-
-    # Prepare content
-    board_width = 5 * (board1.width + board2.width + 5)  # Approximate width of both boards with padding
-    side_padding = max((terminal_width - board_width) // 2, 0)  # Calculate left/right padding
-
-    print(" " * side_padding + " "*(3*board1.width//2 + 1) + f"{player_names[0]}'s BOARD" + " " * ((3*board1.width//2 + 12) + (3* board2.width//2 -4))  + f"{player_names[1]}'s BOARD")
-    print(" " * side_padding + "    " + " ".join(f"{i + 1:^3}" for i in range(board1.width)) + " " * 10 + "     " + " ".join(f"{i + 1:^3}" for i in range(board2.width)))
-    print(" " * side_padding + "   +" + "---+" * board1.width + " " * 10 + "   +" + "---+" * board2.width)
-
-    for row_num in range(board1.height):
-        # Hide ships accordingly
-        if current_player_index == -1:
-            # Game over: reveal all ships
-            board1_row = board1.grid[row_num]
-            board2_row = board2.grid[row_num]
-        else:
-            # During the game: hide ships on both boards
-            board1_row = [cell if cell in ['X', 'O'] else ' ' for cell in board1.grid[row_num]]
-            board2_row = [cell if cell in ['X', 'O'] else ' ' for cell in board2.grid[row_num]]
-
-        board1_row_content = "|".join(f"{str(cell):^3}" for cell in board1_row)
-        board2_row_content = "|".join(f"{str(cell):^3}" for cell in board2_row)
-
-        # Print content with padding
-        print(f"{' ' * side_padding}{alphabet[row_num]:^2} |{board1_row_content}| {' ' * 10}{alphabet[row_num]:^2}|{board2_row_content}|")
-        print(" " * side_padding + "   +" + "---+" * board1.width + " " * 10 + "   +" + "---+" * board2.width)
+    # Ships stay hidden on both boards until the game is over (index -1)
+    hide_ships = current_player_index != -1
+    print(render_side_by_side(board1.grid, board2.grid, f"{player_names[0]}'s BOARD", f"{player_names[1]}'s BOARD", hide_ships, hide_ships))
 
 
 def format_time(seconds):
@@ -172,12 +22,20 @@ def format_time(seconds):
     minutes, seconds = divmod(remainder, 60)
     return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02}"
 
-def game_loop(player1_board, player2_board, player1_targeting, player2_targeting, player_names):
-    """Main game loop for two players"""
+def game_loop(player1_board, player2_board, player1_targeting, player2_targeting, player_names, bus=None):
+    """Main game loop for two players, engine events go to bus"""
 
     elapsed_time = {player_names[0]: 0, player_names[1]: 0}
     start_time = time.time()
-    messages = {player_names[0]: [], player_names[1]: []}  # Messages for each player
+    messages = {name: deque(maxlen=MESSAGE_HISTORY) for name in player_names}  # Latest messages for each player
+
+    bus = bus or EventBus()
+    for name, targeting in zip(player_names, (player1_targeting, player2_targeting)):
+        targeting.bus = bus
+        targeting.shooter = name
+    # Each player sees their sinks under the message of the shot that caused them
+    bus.subscribe(Sunk, lambda event: messages[event.shooter].append(
+        messages[event.shooter].pop() + f"\nYou have sunk opponent's {event.ship}!"))
     tries = {player_names[0]: 0, player_names[1]: 0}  # Number of tries for each player
 
     current_player = 0  # Index to switch between players
@@ -206,7 +64,7 @@ def game_loop(player1_board, player2_board, player1_targeting, player2_targeting
             
 
             # Print last messages
-            for msg in messages[player][-2:]:
+            for msg in messages[player]:
                 print(msg)
 
             # Input validation loop
@@ -236,6 +94,7 @@ def game_loop(player1_board, player2_board, player1_targeting, player2_targeting
             success, message = player_targeting.fire(user_input)
             if message:
                 messages[player].append(message)
+            bus.dispatch()
 
             if not success:
                 # If the shot was invalid (e.g., already targeted), re-prompt without proceeding
@@ -272,10 +131,12 @@ def game_loop(player1_board, player2_board, player1_targeting, player2_targeting
 
     if winner:
         print(f"\nGame Over! {winner} has sunk all {loser}'s ships!")
+        bus.emit(GameOver, winner, loser, format_time(total_time), tries[winner])
+        bus.dispatch()
     else:
         print("\nGame Over!")
 
-    return [winner, loser, format_time(total_time), tries[winner]]
+    return [winner, loser, format_time(total_time), tries.get(winner)]
 
 def game_loop_setup():
     # Initialize players
@@ -284,12 +145,17 @@ def game_loop_setup():
     player_names.append(input("Enter name for Player 1: ").strip() or "Player 1")
     player_names.append(input("Enter name for Player 2: ").strip() or "Player 2")
 
-    # Create boards for both players
-    player1_board = Board(5, 5)  # Player 1's board
-    player1_board.place_ships_random()
-
-    player2_board = Board(5, 5)  # Player 2's board
-    player2_board.place_ships_random()
+    try:
+        check_fleet_fits(5, 5, Ship_Classes)
+    except ValueError as e:
+        print(f"Can't start a game: {e}.")
+        return
+
+    # Create boards for both players, ready-made from the background pool
+    board_pool = get_board_pool(Board)
+    player1_board = board_pool.take(5)  # Player 1's board
+    player2_board = board_pool.take(5)  # Player 2's board
+    log_pool_stats(Board)
 
     # Create targeting systems
     player1_targeting = TargetingSystem(player2_board)
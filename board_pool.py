@@ -0,0 +1,116 @@
+import logging
+import threading
+from collections import deque
+
+# Defaults for the shared pools, per board size
+POOL_CAPACITY = 4
+REFILL_THRESHOLD = 2
+
+class BoardPool:
+    """
+    Keeps ready-made boards with ships already placed, per board size.
+
+    A daemon thread tops a size back up to `capacity` whenever it drops
+    below `refill_threshold`, so starting a game normally just pops a
+    board (a hit). If the pool is empty the board is built on the spot
+    (a miss) and that size is kept warm from then on.
+    """
+
+    def __init__(self, board_class, sizes=(), capacity=POOL_CAPACITY, refill_threshold=REFILL_THRESHOLD):
+        if not 0 <= refill_threshold <= capacity:
+            raise ValueError("refill_threshold must be between 0 and capacity")
+        self.board_class = board_class
+        self.capacity = capacity
+        self.refill_threshold = refill_threshold
+        self.pools = {size: deque() for size in sizes}
+        self.hits = 0
+        self.misses = 0
+        self.condition = threading.Condition()
+        self.refilling = set(self.pools)
+        self.thread = threading.Thread(target=self._refill_loop, name="board-pool", daemon=True)
+        self.thread.start()
+
+    def _build(self, size):
+        board = self.board_class(size, size)
+        board.place_ships_random()
+        return board
+
+    def _refill_loop(self):
+        while True:
+            with self.condition:
+                while not self.refilling:
+                    self.condition.wait()
+                size = next(iter(self.refilling))
+
+            try:
+                board = self._build(size)  # Built without holding the lock
+            except ValueError as e:
+                # The fleet doesn't fit this size, take() will report it to the player
+                logging.error(f"Board pool can't build {size}x{size} boards: {e}")
+                with self.condition:
+                    self.refilling.discard(size)
+                continue
+
+            with self.condition:
+                pool = self.pools[size]
+                pool.append(board)
+                if len(pool) >= self.capacity:
+                    self.refilling.discard(size)
+                self.condition.notify_all()
+
+    def take(self, size):
+        """A board of size x size with ships placed, from the pool if possible"""
+        with self.condition:
+            pool = self.pools.setdefault(size, deque())
+            board = pool.popleft() if pool else None
+            if board is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if len(pool) < self.refill_threshold or board is None:
+                self.refilling.add(size)
+                self.condition.notify_all()
+
+        if board is None:
+            board = self._build(size)
+        return board
+
+    def stats(self):
+        with self.condition:
+            ready = {size: len(pool) for size, pool in self.pools.items()}
+            return {'hits': self.hits, 'misses': self.misses, 'ready': ready}
+
+_pools = {}
+
+def get_board_pool(board_class, sizes=()):
+    """The shared pool for a Board class, started on first use"""
+    if board_class not in _pools:
+        _pools[board_class] = BoardPool(board_class, sizes)
+    return _pools[board_class]
+
+def log_pool_stats(board_class):
+    if board_class in _pools:
+        logging.info(f"Board pool for {board_class.__module__}.{board_class.__name__}: {_pools[board_class].stats()}")
+
+if __name__ == "__main__":
+
+    # Compare taking boards from a warm pool with building them directly
+    import time
+
+    from board import Board
+
+    pool = BoardPool(Board, sizes=(7,), capacity=8)
+    time.sleep(0.5)  # Let the pool warm up
+
+    start = time.perf_counter()
+    for _ in range(8):
+        pool.take(7)
+    pooled = (time.perf_counter() - start) / 8
+
+    start = time.perf_counter()
+    for _ in range(8):
+        pool._build(7)
+    direct = (time.perf_counter() - start) / 8
+
+    print(f"Pooled: {pooled * 1e6:.1f} us per board, direct: {direct * 1e6:.1f} us per board")
+    print(pool.stats())
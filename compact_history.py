@@ -0,0 +1,132 @@
+import argparse
+import fcntl
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+
+from history_parser import parse_record
+from history_writer import HISTORY_HEADER, HistoryWriter
+from leaderboard import DIFFICULTIES
+
+# Index files built from a history's byte offsets, cleared whenever it is rewritten
+SIDECAR_SUFFIXES = ('.names', '.rank')
+UNFINISHED_MODES = ('keep', 'drop', 'archive')
+
+CompactionReport = namedtuple('CompactionReport', 'path bytes_before bytes_after kept blank torn duplicates unfinished')
+
+def archive_path_for(history_path):
+    """Where archived unfinished games go, e.g. txt_files/easy_game_history_unfinished.txt"""
+    base, extension = os.path.splitext(history_path)
+    return f"{base}_unfinished{extension}"
+
+def _lock_sidecars(history_path):
+    """Opens and locks every index sidecar of a history file, the same lock their update() takes"""
+    sidecars = []
+    for suffix in SIDECAR_SUFFIXES:
+        sidecar = open(os.path.splitext(history_path)[0] + suffix, 'ab')
+        fcntl.flock(sidecar, fcntl.LOCK_EX)
+        sidecars.append(sidecar)
+    return sidecars
+
+def compact_history(history_path, dedupe=False, unfinished='keep'):
+    """
+    Rewrites a history file into canonical form: the header, then one
+    repr(list) record per line. Blank lines and torn or malformed writes
+    are removed. With dedupe, repeated records keep only their first copy.
+    Unfinished games (no winner) are kept, dropped or moved to the archive
+    file next to the history.
+
+    The file is streamed into a temporary copy while holding the writers'
+    lock and swapped in with os.replace. The index sidecars are cleared
+    under their own locks, so nothing reads offsets into the old file.
+    """
+    if unfinished not in UNFINISHED_MODES:
+        raise ValueError(f"unfinished must be one of {', '.join(UNFINISHED_MODES)}")
+
+    counts = {'kept': 0, 'blank': 0, 'torn': 0, 'duplicates': 0, 'unfinished': 0}
+    seen = set()  # 16-byte digests, so dedupe memory stays small on huge files
+    directory = os.path.dirname(os.path.abspath(history_path))
+
+    with open(history_path, 'rb') as source:
+        fcntl.flock(source, fcntl.LOCK_EX)  # Writers append under this lock
+        try:
+            bytes_before = os.fstat(source.fileno()).st_size
+            source.readline()
+            source.readline()  # Header
+
+            archive = HistoryWriter(archive_path_for(history_path), batch_size=1024) if unfinished == 'archive' else None
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.compact-', delete=False) as target:
+                try:
+                    target.write(HISTORY_HEADER)
+                    for raw in source:
+                        line = raw.decode(errors='replace')
+                        if not line.strip():
+                            counts['blank'] += 1
+                            continue
+                        record = parse_record(line)
+                        if record is None:
+                            counts['torn'] += 1
+                            continue
+                        if record[2] is None:
+                            counts['unfinished'] += 1
+                            if archive:
+                                archive.append(record)
+                            if unfinished != 'keep':
+                                continue
+                        canonical = f"{record}\n"
+                        if dedupe:
+                            digest = hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+                            if digest in seen:
+                                counts['duplicates'] += 1
+                                continue
+                            seen.add(digest)
+                        target.write(canonical)
+                        counts['kept'] += 1
+
+                    target.flush()
+                    os.fsync(target.fileno())
+                    os.chmod(target.name, os.stat(history_path).st_mode & 0o777)
+                    if archive:
+                        archive.close()  # Archived before the originals disappear
+
+                    sidecars = _lock_sidecars(history_path)
+                    try:
+                        for sidecar in sidecars:
+                            sidecar.truncate(0)
+                        os.replace(target.name, history_path)
+                    finally:
+                        for sidecar in sidecars:
+                            sidecar.close()  # Closing releases the lock
+                except BaseException:
+                    os.unlink(target.name)
+                    raise
+        finally:
+            fcntl.flock(source, fcntl.LOCK_UN)
+
+    return CompactionReport(history_path, bytes_before, os.path.getsize(history_path), **counts)
+
+def format_report(report, unfinished):
+    reclaimed = report.bytes_before - report.bytes_after
+    share = 100 * reclaimed / report.bytes_before if report.bytes_before else 0
+    unfinished_note = {'keep': "kept", 'drop': "dropped", 'archive': "archived"}[unfinished]
+    return (f"{report.path}: {report.bytes_before:,} -> {report.bytes_after:,} bytes, "
+            f"reclaimed {reclaimed:,} ({share:.1f}%)\n"
+            f"  {report.kept} games kept, {report.blank} blank lines, {report.torn} torn lines, "
+            f"{report.duplicates} duplicates, {report.unfinished} unfinished games {unfinished_note}")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compact and repair game history files")
+    parser.add_argument('paths', nargs='*', default=[path for path, _ in DIFFICULTIES.values()],
+                        help="History files to compact (all difficulties by default)")
+    parser.add_argument('--dedupe', action='store_true', help="Keep only the first copy of repeated records")
+    parser.add_argument('--unfinished', choices=UNFINISHED_MODES, default='keep',
+                        help="What to do with games that have no winner")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"{path}: not found, skipped")
+            continue
+        print(format_report(compact_history(path, args.dedupe, args.unfinished), args.unfinished))
@@ -0,0 +1,355 @@
+import random
+import sys
+import time
+from collections import OrderedDict
+
+# The exact search only starts once at most this many fleet layouts fit what has been seen
+ENDGAME_LAYOUTS = 200
+# Placement nodes visited while counting layouts before giving up (the board is still too open)
+ENUMERATION_LIMIT = 50_000
+# Solved positions kept by default, least recently used ones are evicted first
+TABLE_CAPACITY = 200_000
+
+MASK64 = (1 << 64) - 1
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _mix(key):
+    """splitmix64 finaliser, so XOR-ing layout keys together can't cancel out structurally"""
+    key = ((key ^ (key >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    key = ((key ^ (key >> 27)) * 0x94d049bb133111eb) & MASK64
+    return key ^ (key >> 31)
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for one board size and fleet: one per cell for
+    "fired at and hit", and one per (cell, ship) for a ship lying there.
+
+    A layout's key is the mixed XOR of its ships' cell keys, and a search
+    position's key the XOR of its layouts' keys and of the hit cells they
+    cover. Narrowing a position down to a subset of its layouts is then
+    one XOR per layout, and the same position reached by shots in another
+    order (or in another game) gets the same key.
+    """
+
+    def __init__(self, height, width, ship_names, seed=0):
+        rng = random.Random(seed)
+        self.ship_state = {name: 1 + i for i, name in enumerate(ship_names)}
+        self.keys = [[rng.getrandbits(64) for _ in range(1 + len(ship_names))] for _ in range(height * width)]
+
+    def fired(self, cell):
+        return self.keys[cell][0]
+
+    def layout(self, ship_names, masks):
+        key = 0
+        for name, mask in zip(ship_names, masks):
+            state = self.ship_state[name]
+            for cell in _bits(mask):
+                key ^= self.keys[cell][state]
+        return _mix(key)
+
+class OutOfTime(Exception):
+    """The search ran past its deadline, the positions it finished stay in the table"""
+
+class TranspositionTable:
+    """Bounded LRU map from Zobrist hash to a solved (expected shots, best cell)"""
+
+    def __init__(self, capacity=TABLE_CAPACITY):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def memory_bytes(self):
+        """Approximate size of the table: the dict plus every key and entry it holds"""
+        size = sys.getsizeof(self.entries)
+        for key, (expected, cell) in self.entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof((expected, cell)) + sys.getsizeof(expected) + sys.getsizeof(cell)
+        return size
+
+    def report(self):
+        return (f"{len(self.entries):,} positions, hit rate {100 * self.hit_rate():.1f}% "
+                f"({self.hits:,} of {self.hits + self.misses:,} lookups), {self.evictions:,} evicted, "
+                f"~{self.memory_bytes() / 1024:,.0f} KiB")
+
+class EndgameSolver:
+    """
+    Exact endgame search for one board size and fleet.
+
+    Given every fleet layout that still fits what has been seen, it finds
+    the shot that minimizes the expected number of shots left, assuming
+    each of those layouts is equally likely (which holds because ships are
+    placed uniformly). Every shot splits the layouts by what it would
+    reveal: a miss, a hit, or which ship it sank. Solved positions go into
+    a transposition table keyed by their Zobrist hash, so the position the
+    next turn starts from, and positions reached again in later games, are
+    looked up instead of searched again. The search is exponential in the
+    worst case, a search cut short by its deadline keeps every position it
+    finished for the next attempt.
+    """
+
+    def __init__(self, height, width, fleet, capacity=TABLE_CAPACITY):
+        self.height, self.width = height, width
+        self.fleet = dict(fleet)
+        self.zobrist = ZobristKeys(height, width, list(self.fleet))
+        self.table = TranspositionTable(capacity)
+        self.placements = {length: self._placement_masks(length) for length in set(self.fleet.values())}
+
+    def _placement_masks(self, length):
+        masks = []
+        for row in range(self.height):
+            for col in range(self.width):
+                if col + length <= self.width:
+                    masks.append(sum(1 << (row * self.width + col + i) for i in range(length)))
+                if length > 1 and row + length <= self.height:
+                    masks.append(sum(1 << ((row + i) * self.width + col) for i in range(length)))
+        return masks
+
+    def cell_mask(self, cells):
+        return sum(1 << (row * self.width + col) for row, col in cells)
+
+    def layouts(self, ship_names, misses, hits, sunk_mask, limit=ENDGAME_LAYOUTS):
+        """
+        Every placement of the ships still afloat that avoids misses and sunk
+        ships, covers every unresolved hit and doesn't lie entirely on hits
+        (it would have sunk). Each layout is a tuple of masks in ship_names
+        order. None if there are more than limit of them.
+        """
+        blocked = misses | sunk_mask
+        names = sorted(ship_names, key=lambda name: -self.fleet[name])
+        options = [[mask for mask in self.placements[self.fleet[name]]
+                    if not mask & blocked and mask & ~hits] for name in names]
+        order = [names.index(name) for name in ship_names]
+        found = []
+        visited = 0
+
+        def place(ship, occupied, chosen):
+            nonlocal visited
+            if ship == len(names):
+                if hits & ~occupied:
+                    return True
+                found.append(tuple(chosen[i] for i in order))
+                return len(found) <= limit
+            for mask in options[ship]:
+                visited += 1
+                if visited > ENUMERATION_LIMIT:
+                    return False
+                if mask & occupied:
+                    continue
+                chosen.append(mask)
+                carry_on = place(ship + 1, occupied | mask, chosen)
+                chosen.pop()
+                if not carry_on:
+                    return False
+            return True
+
+        if not place(0, 0, []):
+            return None
+        return found
+
+    def best_shot(self, remaining_ships, misses, hits, sunk, budget=None):
+        """
+        The exact best (row, col) and its expected shots left. None if too
+        many layouts are still possible or the search needs more than budget
+        seconds (None means no time limit). misses and hits are sets of cells
+        (hits only those not on a sunk ship), sunk is {ship_name: positions}.
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        ship_names = list(remaining_ships)
+        miss_mask, hit_mask = self.cell_mask(misses), self.cell_mask(hits)
+        sunk_mask = self.cell_mask(cell for positions in sunk.values() for cell in positions)
+        layouts = self.layouts(ship_names, miss_mask, hit_mask, sunk_mask)
+        if not layouts:
+            return None
+        search = EndgameSearch(self, ship_names, layouts, deadline)
+        try:
+            expected, cell = search.solve((1 << len(layouts)) - 1, miss_mask | hit_mask | sunk_mask)
+        except OutOfTime:
+            return None
+        return divmod(cell, self.width), expected
+
+class EndgameSearch:
+    """
+    The search below one position. A position further down is a subset of
+    its layouts, held as a bitset over their indices, plus the fired cells.
+    Per cell (and per ship placement) bitsets of the layouts that have a
+    ship there turn splitting a subset by a shot's outcome into a few
+    integer ANDs.
+    """
+
+    def __init__(self, solver, ship_names, layouts, deadline=None):
+        self.deadline = deadline
+        self.table = solver.table
+        self.zobrist = solver.zobrist
+        self.ships = len(ship_names)
+        self.keys = [solver.zobrist.layout(ship_names, masks) for masks in layouts]
+        self.unions = [sum(masks) for masks in layouts]
+        self.cover = {}  # cell -> layouts with any ship on it
+        self.on_ship = {}  # (ship, cell) -> layouts with that ship on it
+        self.placed = {}  # (ship, placement) -> layouts with that ship exactly there
+        self.through = {}  # cell -> every (ship, placement) covering it
+        for index, masks in enumerate(layouts):
+            bit = 1 << index
+            for ship, mask in enumerate(masks):
+                if (ship, mask) not in self.placed:
+                    self.placed[ship, mask] = 0
+                    for cell in _bits(mask):
+                        self.through.setdefault(cell, []).append((ship, mask))
+                self.placed[ship, mask] |= bit
+                for cell in _bits(mask):
+                    self.cover[cell] = self.cover.get(cell, 0) | bit
+                    self.on_ship[ship, cell] = self.on_ship.get((ship, cell), 0) | bit
+
+    def key(self, group, fired):
+        """
+        Zobrist key of a position. Only the fired cells its layouts cover can
+        change the answer, so those are all it holds besides the layouts.
+        """
+        key = union = 0
+        for index in _bits(group):
+            key ^= self.keys[index]
+            union |= self.unions[index]
+        for cell in _bits(fired & union):
+            key ^= self.zobrist.fired(cell)
+        return key, union
+
+    def lower_bound(self, group, open_cells):
+        """Every layout needs at least all of its unfired ship cells"""
+        remaining = 0
+        for index in _bits(group):
+            remaining += (self.unions[index] & open_cells).bit_count()
+        return remaining / group.bit_count()
+
+    def solve(self, group, fired):
+        """(expected shots left, best cell index) for the layouts in group"""
+        key, union = self.key(group, fired)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise OutOfTime
+
+        open_cells = union & ~fired
+        count = group.bit_count()
+        if count == 1:
+            result = (float(open_cells.bit_count()), (open_cells & -open_cells).bit_length() - 1)
+            self.table.put(key, result)
+            return result
+
+        # A guaranteed hit has to be fired at some point, so take it now. Cells
+        # with the same ship in the same layouts lead to the same outcomes, try one.
+        cells = list(_bits(open_cells))
+        certain = [cell for cell in cells if self.cover[cell] & group == group]
+        if certain:
+            candidates = certain[:1]
+        else:
+            distinct = {}
+            for cell in cells:
+                signature = tuple(group & self.on_ship.get((ship, cell), 0) for ship in range(self.ships))
+                distinct.setdefault(signature, cell)
+            candidates = distinct.values()
+
+        # Split the layouts by what each candidate shot would reveal: a miss, a
+        # hit, or which ship it sank and where. Try the best bounded shot first.
+        options = []
+        for cell in candidates:
+            bit = 1 << cell
+            now_fired = fired | bit
+            hit = group & self.cover[cell]
+            groups = [group & ~hit] if hit != group else []
+            for ship, mask in self.through[cell]:
+                if not mask & ~now_fired:
+                    sunk = hit & self.placed[ship, mask]
+                    if sunk:
+                        groups.append(sunk)
+                        hit &= ~sunk
+            if hit:
+                groups.append(hit)
+            bounds = [(outcome, self.lower_bound(outcome, open_cells & ~bit)) for outcome in groups]
+            lower = 1 + sum(outcome.bit_count() * bound for outcome, bound in bounds) / count
+            options.append((lower, cell, now_fired, bounds))
+        options.sort(key=lambda option: option[0])
+
+        best = (float('inf'), None)
+        for lower, cell, now_fired, bounds in options:
+            if lower >= best[0]:
+                break  # Sorted by bound, nothing later can do better
+            expected = lower
+            for outcome, bound in bounds:
+                if bound == 0:
+                    continue
+                child, _ = self.solve(outcome, now_fired)
+                expected += outcome.bit_count() * (child - bound) / count
+                if expected >= best[0]:
+                    break
+            if expected < best[0]:
+                best = (expected, cell)
+
+        self.table.put(key, best)
+        return best
+
+_solvers = {}
+
+def get_solver(height, width, fleet):
+    """One shared solver (and transposition table) per board size and fleet for the whole process"""
+    key = (height, width, tuple(fleet.items()))
+    if key not in _solvers:
+        _solvers[key] = EndgameSolver(height, width, fleet)
+    return _solvers[key]
+
+if __name__ == "__main__":
+
+    # Benchmark: the endgame strategy against plain probability search on the same boards
+    import argparse
+
+    import endgame  # The strategies share the imported module's solvers, not this __main__ copy
+    from board import Ship_Classes
+    from strategies import INTERACTIVE_MOVE_BUDGET
+    from strategy_harness import play_out
+
+    parser = argparse.ArgumentParser(description="Play the exact endgame strategy and report the transposition table")
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--size', type=int, default=7)
+    parser.add_argument('--budget', type=float, default=INTERACTIVE_MOVE_BUDGET)
+    args = parser.parse_args()
+
+    for name in ('probability', 'endgame'):
+        shots = []
+        slowest = 0.0
+        start = time.perf_counter()
+        for seed in range(args.games):
+            tries, move_times = play_out(name, seed, args.size, args.budget)
+            shots.append(tries)
+            slowest = max(slowest, max(move_times))
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} mean {sum(shots) / len(shots):6.2f} shots, {elapsed:.1f}s, slowest move {1000 * slowest:.1f}ms")
+
+    print(f"Transposition table: {endgame.get_solver(args.size, args.size, Ship_Classes).table.report()}")
@@ -0,0 +1,43 @@
+from collections import namedtuple
+
+# Typed game events. shooter is whoever fired ('Player', 'AI' or a player's name)
+Shot = namedtuple('Shot', 'shooter cell hit')
+Hit = namedtuple('Hit', 'shooter cell ship')
+Sunk = namedtuple('Sunk', 'shooter ship positions')
+GameOver = namedtuple('GameOver', 'winner loser time_elapsed shots')
+
+class EventBus:
+    """
+    Collects game events and hands them to subscribers in batches.
+
+    emit() only builds and queues an event when something subscribed to
+    that type, so a headless game with no observers pays one dict lookup
+    per event and nothing else. Queued events are delivered, in order,
+    when dispatch() is called or when the queue reaches batch_size.
+    """
+
+    def __init__(self, batch_size=256):
+        self.subscribers = {}
+        self.queue = []
+        self.batch_size = batch_size
+
+    def subscribe(self, event_type, handler):
+        self.subscribers.setdefault(event_type, []).append(handler)
+
+    def emit(self, event_type, *fields):
+        if event_type not in self.subscribers:
+            return
+        self.queue.append(event_type(*fields))
+        if len(self.queue) >= self.batch_size:
+            self.dispatch()
+
+    def dispatch(self):
+        queue, self.queue = self.queue, []
+        for event in queue:
+            for handler in self.subscribers[type(event)]:
+                handler(event)
+
+def emit(bus, event_type, *fields):
+    """Emit on bus if there is one (engine objects run without a bus by default)"""
+    if bus is not None:
+        bus.emit(event_type, *fields)
@@ -0,0 +1,129 @@
+import argparse
+import time
+
+import numpy as np
+
+from batch_sim import BATCH_STRATEGIES, CHUNK_GAMES, BatchGames, place_fleets, place_fleets_sequential
+from board import Ship_Classes
+from render import ALPHABET
+
+PLACEMENTS = {'uniform': place_fleets, 'sequential': place_fleets_sequential}
+
+class Heatmaps:
+    """
+    Per-cell counts over many simulated games on one board size.
+
+    occupancy[k] counts the games where ship k covered each cell,
+    first_shots where the strategy fired first, and survival[cell, t]
+    the games where that cell was still untouched for exactly t turns
+    (fired at on turn t, or t shots were enough to win without it).
+    Everything is accumulated with np.add.at, so a chunk of games costs a
+    handful of vectorized scatters.
+    """
+
+    def __init__(self, height, width, fleet=None):
+        fleet = fleet or Ship_Classes
+        self.height, self.width = height, width
+        self.ship_names = list(fleet)
+        cells = height * width
+        self.games = 0
+        self.occupancy = np.zeros((len(fleet), height, width), dtype=np.int64)
+        self.first_shots = np.zeros((height, width), dtype=np.int64)
+        self.survival = np.zeros((cells, cells + 1), dtype=np.int64)
+
+    def add_placements(self, ship_ids):
+        games, rows, cols = np.nonzero(ship_ids)
+        np.add.at(self.occupancy, (ship_ids[games, rows, cols] - 1, rows, cols), 1)
+
+    def add_games(self, batch):
+        """A finished BatchGames played with record_turns"""
+        self.games += batch.games
+        _, first = np.nonzero(batch.fired_at == 0)
+        np.add.at(self.first_shots.ravel(), first, 1)
+        survived = np.where(batch.fired_at >= 0, batch.fired_at, batch.shots[:, None])
+        cells = np.broadcast_to(np.arange(batch.cells), survived.shape)
+        np.add.at(self.survival, (cells.ravel(), survived.ravel()), 1)
+
+    def ship_share(self):
+        """Fraction of games with any ship on each cell"""
+        return self.occupancy.sum(axis=0) / max(self.games, 1)
+
+    def first_shot_share(self):
+        return self.first_shots / max(self.games, 1)
+
+    def mean_survival(self):
+        """Average turns each cell survives"""
+        turns = self.survival @ np.arange(self.survival.shape[1])
+        return (turns / max(self.games, 1)).reshape(self.height, self.width)
+
+    def arrays(self):
+        """Everything as plain arrays, ready for np.savez"""
+        return {'games': np.array(self.games), 'ship_names': np.array(self.ship_names),
+                'occupancy': self.occupancy, 'first_shots': self.first_shots, 'survival': self.survival}
+
+def collect(games, size, placement='uniform', strategy='random', seed=None, fleet=None):
+    """Plays `games` games on a size x size board and returns their Heatmaps"""
+    rng = np.random.default_rng(seed)
+    heatmaps = Heatmaps(size, size, fleet)
+    for start in range(0, games, CHUNK_GAMES):
+        count = min(CHUNK_GAMES, games - start)
+        ship_ids = PLACEMENTS[placement](count, size, size, fleet, rng)
+        heatmaps.add_placements(ship_ids)
+        batch = BatchGames(ship_ids, record_turns=True)
+        batch.run(BATCH_STRATEGIES[strategy](count, size, size, rng))
+        heatmaps.add_games(batch)
+    return heatmaps
+
+def placement_heatmap(games, size, placement='uniform', seed=None, fleet=None):
+    """Only the ship occupancy share, without playing the games"""
+    rng = np.random.default_rng(seed)
+    heatmaps = Heatmaps(size, size, fleet)
+    for start in range(0, games, CHUNK_GAMES):
+        count = min(CHUNK_GAMES, games - start)
+        heatmaps.add_placements(PLACEMENTS[placement](count, size, size, fleet, rng))
+        heatmaps.games += count
+    return heatmaps.ship_share()
+
+def render_heatmap(values, title, cell_format="{:3.0f}"):
+    """A grid of numbers laid out like the game boards"""
+    height, width = values.shape
+    separator = "   +" + "---+" * width
+    lines = [f"   {title}", "    " + " ".join(f"{i + 1:^3}" for i in range(width)), separator]
+    for row in range(height):
+        cells = "|".join(cell_format.format(value) for value in values[row].tolist())
+        lines.append(f"{ALPHABET[row]:^2} |{cells}|")
+        lines.append(separator)
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Per-cell heatmaps of ship placement, first shots and cell survival")
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 7, 10])
+    parser.add_argument('--placement', choices=PLACEMENTS, default='uniform')
+    parser.add_argument('--strategy', choices=BATCH_STRATEGIES, default='random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', action='store_true',
+                        help="Also show how far the other placement's ship heatmap is from this one")
+    parser.add_argument('--save', metavar='PREFIX', help="Write the arrays to PREFIX_<size>x<size>.npz")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        start = time.perf_counter()
+        heatmaps = collect(args.games, size, args.placement, args.strategy, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{size}x{size}, {args.games:,} games ({args.placement} placement, {args.strategy}) "
+              f"in {elapsed:.1f}s\n")
+        print(render_heatmap(100 * heatmaps.ship_share(), "Ship on cell (% of games)"))
+        print(render_heatmap(100 * heatmaps.first_shot_share(), "First shot (% of games)"))
+        print(render_heatmap(heatmaps.mean_survival(), "Turns survived (mean)"))
+
+        if args.compare:
+            other = 'sequential' if args.placement == 'uniform' else 'uniform'
+            difference = 100 * (placement_heatmap(args.games, size, other, args.seed + 1) - heatmaps.ship_share())
+            print(render_heatmap(difference, f"{other} minus {args.placement} (percentage points)", "{:+3.0f}"))
+            print(f"   Largest gap {np.abs(difference).max():.1f} points")
+
+        if args.save:
+            np.savez(f"{args.save}_{size}x{size}.npz", **heatmaps.arrays())
+        print()
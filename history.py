@@ -1,3 +1,4 @@
+import os
 import re
 
 # DECORATOR IN USE!
@@ -11,6 +12,55 @@ def read_file_generator(file_path):
             formatted_line = pattern.sub('', line).strip()
             yield formatted_line
 
+def file_identity(file_path):
+    """
+    (device, inode) of a history file. It changes when the file is swapped
+    for a rewritten copy (e.g. by compact_history), which tells anything
+    tailing the file by offset to start over.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+def history_replaced(tailer, sidecar=None):
+    """
+    True when tailer, anything reading tailer.history_path by byte offset
+    and remembering its file_identity in tailer.history_id, has to start
+    over because the file was swapped for a new or compacted copy. The
+    current identity is recorded either way.
+
+    Indexes that persist offsets pass their sidecar, opened and locked:
+    a swap clears it, and a sidecar shorter than tailer.sidecar_pos (cleared
+    by another process) also means starting over.
+    """
+    identity = file_identity(tailer.history_path)
+    swapped = tailer.history_id is not None and identity != tailer.history_id
+    tailer.history_id = identity
+    if sidecar is None:
+        return swapped
+    if swapped:
+        sidecar.truncate(0)
+        return True
+    return os.fstat(sidecar.fileno()).st_size < tailer.sidecar_pos
+
+def read_lines_from(file_path, offset=0):
+    """
+    Yields (offset, next_offset, line) for every complete line from a byte offset on.
+    The two header lines are skipped when starting from the top, and a
+    last line without its newline (a write still in progress) is left for later.
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(offset)
+        if offset == 0:
+            offset += len(file.readline()) + len(file.readline())
+        for line in file:
+            if not line.endswith(b'\n'):
+                return
+            yield offset, offset + len(line), line.decode(errors='replace')
+            offset += len(line)
+
 def print_read_file(file_path):
     for idx, line in enumerate(read_file_generator(file_path)):
         if idx >= 2:
@@ -0,0 +1,163 @@
+import argparse
+import zipfile
+
+import numpy as np
+
+from history import read_lines_from
+from history_parser import parse_record
+from leaderboard import DIFFICULTIES, time_to_seconds
+
+EXPORT_PATH = 'txt_files/history.npz'
+ROWS_PER_CHUNK = 65536  # Rows converted to arrays at a time while streaming
+NO_VALUE = -1  # Code of a missing winner/loser (unfinished games)
+
+# One row per game. player, winner and loser are codes into the
+# players/outcomes vocabularies, difficulty into difficulties
+COLUMNS = {
+    'difficulty': np.uint8,
+    'player': np.int32,
+    'played_at': 'datetime64[s]',
+    'winner': np.int32,
+    'loser': np.int32,
+    'seconds': np.int32,
+    'shots': np.int16,
+}
+
+def _iso_timestamp(text):
+    """'DD-MM-YYYY HH:MM:SS' to 'YYYY-MM-DDTHH:MM:SS', which NumPy parses natively"""
+    return f"{text[6:10]}-{text[3:5]}-{text[0:2]}T{text[11:]}"
+
+class ColumnBuilder:
+    """
+    Accumulates history rows into typed column chunks. Strings are
+    dictionary encoded as they arrive, so memory grows with the number of
+    distinct players rather than with the rows.
+    """
+
+    def __init__(self):
+        self.players = {}  # Player name -> code
+        self.outcomes = {}  # Winner/loser name -> code
+        self.rows = []
+        self.chunks = []
+
+    def _code(self, vocabulary, value):
+        if value is None:
+            return NO_VALUE
+        return vocabulary.setdefault(value, len(vocabulary))
+
+    def add(self, difficulty_code, record):
+        username, played_at, winner, loser, time_elapsed, shots = record
+        self.rows.append((
+            difficulty_code,
+            self._code(self.players, username),
+            _iso_timestamp(played_at),
+            self._code(self.outcomes, winner),
+            self._code(self.outcomes, loser),
+            time_to_seconds(time_elapsed),
+            shots,
+        ))
+        if len(self.rows) >= ROWS_PER_CHUNK:
+            self._flush()
+
+    def _flush(self):
+        if not self.rows:
+            return
+        values = zip(*self.rows)
+        self.chunks.append({name: np.array(column, dtype=dtype) for (name, dtype), column in zip(COLUMNS.items(), values)})
+        self.rows = []
+
+    def columns(self):
+        self._flush()
+        columns = {name: np.concatenate([chunk[name] for chunk in self.chunks] + [np.empty(0, dtype=dtype)])
+                   for name, dtype in COLUMNS.items()}
+        # Vocabularies as fixed-width strings, so they can be memory mapped like the rest
+        columns['players'] = np.array(list(self.players), dtype=str)
+        columns['outcomes'] = np.array(list(self.outcomes), dtype=str)
+        columns['difficulties'] = np.array(list(DIFFICULTIES), dtype=str)
+        return columns
+
+def export_history(output_path=EXPORT_PATH, difficulties=DIFFICULTIES):
+    """
+    Streams every history file into typed columns (see COLUMNS) and saves
+    them as one .npz bundle. Unfinished games are kept with
+    winner = loser = NO_VALUE.
+    Returns the number of games exported.
+    """
+    builder = ColumnBuilder()
+    for code, (file_path, _) in enumerate(difficulties.values()):
+        try:
+            for _, _, line in read_lines_from(file_path):
+                record = parse_record(line)
+                if record is not None:  # Blank, torn or malformed lines aren't games
+                    builder.add(code, record)
+        except FileNotFoundError:
+            continue
+
+    columns = builder.columns()
+    # Stored uncompressed (ZIP_STORED) so load_history can map the columns in place
+    np.savez(output_path, **columns)
+    return len(columns['shots'])
+
+def load_history(path=EXPORT_PATH):
+    """
+    The columns of an exported bundle as read-only arrays memory mapped
+    straight out of the .npz file, nothing is read until it's used.
+    """
+    columns = {}
+    with zipfile.ZipFile(path) as bundle, open(path, 'rb') as file:
+        for info in bundle.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} in {path} is compressed and can't be memory mapped")
+            # The member's data starts after its local file header
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2').tolist()
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            name = info.filename.removesuffix('.npy')
+            if not shape or 0 in shape:
+                columns[name] = np.empty(shape, dtype=dtype)
+            else:
+                columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=file.tell(), shape=shape,
+                                          order='F' if fortran_order else 'C')
+    return columns
+
+def win_rates_per_day(columns):
+    """(days, games, player win rate) over every finished game against the AI"""
+    player_code = np.flatnonzero(columns['outcomes'] == 'Player')
+    finished = columns['winner'] != NO_VALUE
+    days = columns['played_at'][finished].astype('datetime64[D]').astype(np.int64)
+    won = columns['winner'][finished] == (player_code[0] if len(player_code) else NO_VALUE)
+    if not len(days):
+        return np.empty(0, dtype='datetime64[D]'), np.empty(0, dtype=np.int64), np.empty(0)
+
+    # Days since the first one index straight into the counts, no sorting needed
+    first = days.min()
+    games = np.bincount(days - first)
+    wins = np.bincount(days - first, weights=won)
+    played = np.flatnonzero(games)
+    return (first + played).astype('datetime64[D]'), games[played], wins[played] / games[played]
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Export every game history file to a columnar .npz bundle")
+    parser.add_argument('--output', default=EXPORT_PATH)
+    args = parser.parse_args()
+
+    import time
+
+    start = time.perf_counter()
+    count = export_history(args.output)
+    print(f"Exported {count} games to {args.output} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    columns = load_history(args.output)
+    days, games, rates = win_rates_per_day(columns)
+    elapsed = time.perf_counter() - start
+    for day, day_games, rate in zip(days[-7:], games[-7:], rates[-7:]):
+        print(f"{day}  {day_games:>6} games  {rate:6.1%} won by players")
+    print(f"Loaded and aggregated in {elapsed * 1e3:.1f} ms")
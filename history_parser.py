@@ -0,0 +1,160 @@
+import argparse
+import ast
+import multiprocessing
+import os
+import re
+
+# One field of a history record: a string in either quote style, None or an integer,
+# followed by the separator or the closing bracket
+FIELD = re.compile(r"""\s*(?:'((?:[^'\\\n]|\\.)*)'|"((?:[^"\\\n]|\\.)*)"|(None)|(-?\d+))\s*(,|\])""")
+RECORD_FIELDS = 6
+
+# The usual shape of a record, matched a whole line at a time: quoted
+# strings without escapes (winner and loser may be None) and the shot
+# count. Anything else (escaped characters, odd spacing) goes through the
+# field scanner
+_TEXT = r"""('[^'\\\n]*'|"[^"\\\n]*")"""
+_OPTIONAL_TEXT = r"""('[^'\\\n]*'|"[^"\\\n]*"|None)"""
+RECORD_LINE = re.compile(rf"^[ \t]*\[{_TEXT}, {_TEXT}, {_OPTIONAL_TEXT}, {_OPTIONAL_TEXT}, {_TEXT}, (-?\d+)\][ \t\r]*$", re.M)
+CHUNK_BYTES = 16 * 1024 * 1024  # Files smaller than this are parsed in-process
+
+def parse_record(line):
+    """
+    Parses one history line written as repr(list), e.g.
+    ['cole', '09-11-2024 19:13:32', 'Player', 'AI', '00:00:16', 25]
+    Returns the same list ast.literal_eval would, or None if the line isn't
+    a complete record (blank, torn or malformed).
+    """
+    line = line.strip()
+    match = RECORD_LINE.match(line)
+    if match:
+        return _fast_record(match.groups())
+    if not line.startswith('['):
+        return None
+    record = []
+    pos = 1
+    while True:
+        match = FIELD.match(line, pos)
+        if match is None:
+            return None
+        single, double, none, number, separator = match.groups()
+        if number is not None:
+            record.append(int(number))
+        elif none is not None:
+            record.append(None)
+        else:
+            text = single if single is not None else double
+            if '\\' in text:
+                text = ast.literal_eval(match.group(0).strip()[:-1])  # Escaped characters, rare
+            record.append(text)
+        pos = match.end()
+        if separator == ']':
+            break
+    if pos != len(line) or len(record) != RECORD_FIELDS:
+        return None
+    return record
+
+def _fast_record(groups):
+    name, played_at, winner, loser, time_elapsed, shots = groups
+    return [name[1:-1], played_at[1:-1],
+            None if winner == 'None' else winner[1:-1],
+            None if loser == 'None' else loser[1:-1],
+            time_elapsed[1:-1], int(shots)]
+
+def parse_records(text):
+    """
+    Every record in a block of history lines, in order. Well-formed lines
+    are matched straight out of the block, only the lines in between go
+    through parse_record one by one.
+    """
+    records = []
+    pos = 0
+    for match in RECORD_LINE.finditer(text):
+        if match.start() > pos:
+            for line in text[pos:match.start()].splitlines():
+                record = parse_record(line)
+                if record is not None:
+                    records.append(record)
+        records.append(_fast_record(match.groups()))
+        pos = match.end()
+    for line in text[pos:].splitlines():
+        record = parse_record(line)
+        if record is not None:
+            records.append(record)
+    return records
+
+def parse_finished(text):
+    """Records of the finished games in a block of history lines"""
+    return [record for record in parse_records(text) if record[2] is not None]  # Unfinished games have no winner
+
+def _header_end(file):
+    file.seek(0)
+    file.readline()
+    file.readline()
+    return file.tell()
+
+def line_aligned_ranges(file_path, chunk_bytes=CHUNK_BYTES):
+    """(start, end) byte ranges covering every record after the header, each ending on a line boundary"""
+    with open(file_path, 'rb') as file:
+        start = _header_end(file)
+        size = os.fstat(file.fileno()).st_size
+        ranges = []
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()  # Move on to the end of the line the cut landed in
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _parse_range(args):
+    file_path, start, end = args
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        return parse_finished(file.read(end - start).decode(errors='replace'))
+
+def read_records_parallel(file_path, processes=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Same result as leaderboard.read_records: every finished game after the
+    two header lines, in file order. Large files are cut into line-aligned
+    byte ranges and parsed in a process pool.
+    """
+    ranges = line_aligned_ranges(file_path, chunk_bytes)
+    tasks = [(file_path, start, end) for start, end in ranges]
+    if len(tasks) <= 1 or processes == 1:
+        return [record for task in tasks for record in _parse_range(task)]
+
+    records = []
+    with multiprocessing.Pool(processes) as pool:
+        for part in pool.imap(_parse_range, tasks):  # imap keeps the chunks in order
+            records.extend(part)
+    return records
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Parse a history file in parallel and time it against literal_eval")
+    parser.add_argument('file_path', nargs='?', default='txt_files/easy_game_history.txt')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    import time
+
+    start = time.perf_counter()
+    with open(args.file_path, 'r') as file:
+        lines = file.read().splitlines()[2:]
+    expected = []
+    for line in lines:
+        try:
+            record = ast.literal_eval(line.strip())
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(record, list) and len(record) == RECORD_FIELDS and record[2] is not None:
+            expected.append(record)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = read_records_parallel(args.file_path, args.processes)
+    parallel = time.perf_counter() - start
+
+    print(f"{len(records)} finished games, literal_eval {baseline:.2f}s, parallel parser {parallel:.2f}s")
+    print("Same records as literal_eval" if records == expected else "MISMATCH with literal_eval")
@@ -0,0 +1,129 @@
+import fcntl
+import os
+import time
+
+from history import file_identity
+
+HISTORY_HEADER = "Player Name, DateTime, Winner, Loser, Time Elapsed, Shots fired\n\n"
+
+class HistoryWriter:
+    """
+    Appends game records to a history file without tearing lines.
+
+    Records are buffered in memory and written in batches. Every batch is
+    written with a single O_APPEND write while holding an exclusive fcntl
+    lock, so many processes can share the same history file safely.
+    """
+
+    def __init__(self, file_path, batch_size=64, flush_interval=1.0):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.records_written = 0
+        self.fd = self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, record):
+        """Queue one record (a list) and flush if the batch is full or stale"""
+        self.buffer.append(f"{record}\n")
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def _open(self):
+        return os.open(self.file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _lock(self):
+        """Locks the file, following it if it was swapped for a compacted copy while we waited"""
+        while True:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            stat = os.fstat(self.fd)
+            if file_identity(self.file_path) == (stat.st_dev, stat.st_ino):
+                return
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = self._open()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        data = "".join(self.buffer).encode()
+
+        self._lock()
+        try:
+            # A brand new file gets the usual header first
+            if os.fstat(self.fd).st_size == 0:
+                data = HISTORY_HEADER.encode() + data
+            view = memoryview(data)
+            while view:
+                written = os.write(self.fd, view)
+                view = view[written:]
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+        self.records_written += len(self.buffer)
+        self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.fd is None:
+            return
+        try:
+            self.flush()
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+def append_record(file_path, record):
+    """Write a single record straight away (used after each interactive game)"""
+    with HistoryWriter(file_path, batch_size=1) as writer:
+        writer.append(record)
+
+def _bench_worker(args):
+    file_path, worker_id, count, batch_size = args
+    with HistoryWriter(file_path, batch_size=batch_size) as writer:
+        for i in range(count):
+            writer.append([f"worker{worker_id}", '09-11-2024 19:13:32', 'Player', 'AI', '00:00:16', i])
+    return count
+
+def benchmark(processes=8, records_per_process=20000, batch_size=64):
+    """Hammer one file from many processes and check no line was torn"""
+    import ast
+    import multiprocessing
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'bench_game_history.txt')
+        jobs = [(file_path, worker_id, records_per_process, batch_size) for worker_id in range(processes)]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            total = sum(pool.map(_bench_worker, jobs))
+        elapsed = time.perf_counter() - start
+
+        torn = 0
+        parsed = 0
+        with open(file_path, 'r') as file:
+            next(file)
+            next(file)
+            for line in file:
+                try:
+                    ast.literal_eval(line)
+                    parsed += 1
+                except Exception:
+                    torn += 1
+
+    print(f"{processes} processes, batch size {batch_size}")
+    print(f"{total} records in {elapsed:.3f}s -> {total / elapsed:,.0f} records/sec")
+    print(f"Parsed {parsed} records, {torn} torn lines")
+
+if __name__ == "__main__":
+
+    for batch_size in (1, 16, 64, 256):
+        benchmark(batch_size=batch_size)
@@ -1,6 +1,15 @@
 import ast  # to convert txt in file to actual list
 import re
 
+from history_parser import read_records_parallel
+
+# History file and board size of every difficulty
+DIFFICULTIES = {
+    'Easy': ('txt_files/easy_game_history.txt', 5),
+    'Medium': ('txt_files/medium_game_history.txt', 6),
+    'Hard': ('txt_files/hard_game_history.txt', 7),
+}
+
 def time_to_seconds(time_str):
     hours, minutes, seconds = map(int, time_str.split(':'))
     total_seconds = hours * 3600 + minutes * 60 + seconds
@@ -21,8 +30,7 @@ def read_records(file_path):
                 # Convert the string representation of the list to an actual list
                 record = ast.literal_eval(line)
                 if record[2] == None:
-                    next(file)
-                    raise ValueError
+                    continue  # Unfinished game
                 records.append(record)
             except Exception as e:
                 #print(f"Error parsing line: {line}\n{e}")
@@ -43,7 +51,7 @@ def process_records(records):
         yield record
 
 def leaderboard_main(file_path):
-    records = read_records(file_path)
+    records = read_records_parallel(file_path)  # Large archives are parsed across cores
     processed_records = list(process_records(records))
 
     # Sort based on the last element (total seconds)
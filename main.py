@@ -1,23 +1,39 @@
 # For game Classes
-from board import Board, TargetingSystem, game_loop, PseudoAI
+from board import Board, TargetingSystem, game_loop, PseudoAI, Ship_Classes
+from events import EventBus, GameOver, Sunk
+from placement import check_fleet_fits
+from board_pool import get_board_pool, log_pool_stats
+from snapshot import snapshot_path, load_snapshot, delete_snapshot
+from strategies import strategy_for_difficulty, INTERACTIVE_MOVE_BUDGET
 
 # For 2 player
 from board2_player import game_loop_setup
 
 # For History
 from history import print_read_file
+from history_writer import append_record
+from name_index import get_name_index
+from rank_index import placement_message
 from datetime import datetime
 
 # For Leaderboard
-from leaderboard import leaderboard_main
+from leaderboard import DIFFICULTIES, leaderboard_main
+from windowed_leaderboard import print_windowed_leaderboard
+from overall_leaderboard import print_overall_leaderboard
+
+# For Player Stats
+from player_stats import PlayerStatsStore, print_player_stats
 
 # For UI
+from terminal_input import KeySession
+from terminal_geometry import terminal_geometry
+
+# For --memprofile
+import memprofile
 import os
 import sys
-import termios
-import tty
-import shutil
 import functools
+import re
 import logging
 
 # Configure logging
@@ -90,97 +106,106 @@ class MenuSystem:
         self.selected_index = 0
         self.in_menu = "Main"
 
-    def get_key(self):
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':
-                ch += sys.stdin.read(2)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-
-        return ch
-
     @staticmethod
     def clear_terminal():
         os.system('cls' if os.name == 'nt' else 'clear')
 
     @staticmethod
     def get_terminal_size():
-        size = shutil.get_terminal_size(fallback=(80, 20))
-        return size
+        # Cached, only re-read after a resize has settled
+        return terminal_geometry().current_size()
 
     @staticmethod
     def center_text(text, width):
         return text.center(width)
 
-    def display_menu(self):
-
-        self.clear_terminal()
-
-        self.width, self.height = self.get_terminal_size()
-
-        terminal_width = self.width
-        terminal_height = self.height
-
-        max_len = max(len(option) for option in self.options)
-        box_width = max_len + 6  # Add padding for the box around the text
-
+    def menu_title(self):
         if self.in_menu == "Main":
-            title = "Welcome to Battleship"
+            return "Welcome to Battleship"
         elif self.in_menu == "SubMenu":
-            title = "Mode Selection"
+            return "Mode Selection"
         elif self.in_menu == "Singleplayer":
-            title = "Difficulty"
+            return "Difficulty"
         elif self.in_menu == "SubMenu_Hist":
-            title = "Game History"
+            return "Game History"
         elif self.in_menu == "SubMenu_Lead":
-            title = "Game Leaderboards"
+            return "Game Leaderboards"
+        return "Null"
+
+    def option_line(self, index):
+        option = self.options[index]
+        if index == self.selected_index:
+            option_str = f"> {option} <".center(self.box_width)
         else:
-            title = "Null"
+            option_str = f" {option} ".center(self.box_width)
+        return self.center_text(f"|{option_str}|", self.width)
 
-        print(self.center_text(title, terminal_width))
-        print(self.center_text("=" * (len(title) + 2), terminal_width))
+    def display_menu(self):
 
-        # Top of the box
-        print(self.center_text("+" + "-" * box_width + "+", terminal_width))
+        self.clear_terminal()
 
-        for i, option in enumerate(self.options):
-            if i == self.selected_index:
-                option_str = f"> {option} <".center(box_width)
-            else:
-                option_str = f" {option} ".center(box_width)
+        self.width, self.height = self.get_terminal_size()
 
-            print(self.center_text(f"|{option_str}|", terminal_width))
+        terminal_width = self.width
 
-        print(self.center_text("+" + "-" * box_width + "+", terminal_width))
+        max_len = max(len(option) for option in self.options)
+        self.box_width = max_len + 6  # Add padding for the box around the text
+
+        title = self.menu_title()
+        lines = [
+            self.center_text(title, terminal_width),
+            self.center_text("=" * (len(title) + 2), terminal_width),
+            # Top of the box
+            self.center_text("+" + "-" * self.box_width + "+", terminal_width),
+        ]
+        self.first_option_row = len(lines) + 1  # Terminal rows are 1-based
+        lines.extend(self.option_line(i) for i in range(len(self.options)))
+        lines.append(self.center_text("+" + "-" * self.box_width + "+", terminal_width))
+
+        KeySession.write("\n".join(lines) + "\n")
+
+    def redraw_options(self, *indexes):
+        """Repaint just the given option rows in place instead of clearing the screen"""
+        output = []
+        for index in indexes:
+            output.append(f"\x1b[{self.first_option_row + index};1H\x1b[2K{self.option_line(index)}")
+        # Park the cursor below the box again
+        output.append(f"\x1b[{self.first_option_row + len(self.options) + 1};1H")
+        KeySession.write("".join(output))
 
     @confirm_quit
     def navigate(self):
-        while True:
+        memprofile.checkpoint(f"menu {type(self).__name__}")
+        geometry = terminal_geometry()
+        # Raw mode is entered once for the whole menu, not once per key
+        with KeySession(wake_fd=geometry.wake_fd) as keys:
             self.display_menu()
-            key = self.get_key()
-
-            if key == '\x1b[A':
-                self.selected_index = (self.selected_index - 1) % len(self.options)
-            elif key == '\x1b[B':
-                self.selected_index = (self.selected_index + 1) % len(self.options)
-            elif key == '\n' or key == '\r':
-                return self.options[self.selected_index]
-            elif key == 'q':
-                return "Exit"
+            while True:
+                previous_index = self.selected_index
+                # A resize wakes this up, and it waits just long enough for the resize to settle
+                for key in keys.read_keys(geometry.resize_timeout()):
+                    if key == '\x1b[A':
+                        self.selected_index = (self.selected_index - 1) % len(self.options)
+                    elif key == '\x1b[B':
+                        self.selected_index = (self.selected_index + 1) % len(self.options)
+                    elif key == '\n' or key == '\r':
+                        return self.options[self.selected_index]
+                    elif key == 'q':
+                        return "Exit"
+
+                if geometry.take_resize():
+                    self.display_menu()  # One full re-layout per burst of resizes
+                elif self.selected_index != previous_index:
+                    self.redraw_options(previous_index, self.selected_index)
 
 # MainMenu Class with Dictionary Comprehension and Signal Handling
 class MainMenu(MenuSystem):
 
     def __init__(self):
-        super().__init__(["Play", "History", "Leaderboard", "Exit"])
+        super().__init__(["Play", "History", "Leaderboard", "Player Stats", "Exit"])
         self.in_menu = "Main"
         # Initialize the option_handlers dictionary
-        self.option_handlers = {option: getattr(self, f"handle_{option.lower()}") for option in self.options}
+        self.option_handlers = {option: getattr(self, f"handle_{option.lower().replace(' ', '_')}") for option in self.options}
 
     @log_function_call
     @handle_errors
@@ -210,13 +235,23 @@ class MainMenu(MenuSystem):
         return submenu.handle_selection()
 
     def handle_history(self):
-        submenu_hist = SubMenu_History("Game History", ["Easy Games", "Medium Games", "Hard Games", "Back"])
+        submenu_hist = SubMenu_History("Game History", [f"{difficulty} Games" for difficulty in DIFFICULTIES] + ["Search Player", "Back"])
         return submenu_hist.handle_selection()
 
     def handle_leaderboard(self):
-        submenu_lead = SubMenu_Leaderboard("Game Leaderboards", ["Easy Leaderboard", "Medium Leaderboard", "Hard Leaderboard", "Back"])
+        submenu_lead = SubMenu_Leaderboard("Game Leaderboards", [f"{difficulty} Leaderboard" for difficulty in DIFFICULTIES] + ["Overall Leaderboard", "Daily Leaderboard", "Weekly Leaderboard", "Monthly Leaderboard", "Back"])
         return submenu_lead.handle_selection()
 
+    def handle_player_stats(self):
+        self.clear_terminal()
+        username = input("Enter a username to look up: ").strip()
+        message = f"PLAYER STATS FOR {username.upper()}"
+        print(message)
+        print("=" * len(message))
+        print_player_stats(username)
+        input("\nPress Enter to continue...")
+        return
+
     def handle_exit(self):
         return "Exit"
 
@@ -226,7 +261,9 @@ class SubMenu_History(MenuSystem):
         super().__init__(options)
         self.title = title
         self.in_menu = "SubMenu_Hist"
-        self.option_handlers = {option: getattr(self, f"handle_{option.lower().replace(' ', '_')}") for option in self.options}
+        # One entry per difficulty, the rest have their own handle_ methods
+        difficulty_handlers = {f"{difficulty} Games": functools.partial(self.display_game_history, difficulty) for difficulty in DIFFICULTIES}
+        self.option_handlers = {option: difficulty_handlers.get(option) or getattr(self, f"handle_{option.lower().replace(' ', '_')}") for option in self.options}
 
     @log_function_call
     @handle_errors
@@ -251,24 +288,32 @@ class SubMenu_History(MenuSystem):
                 print("Invalid option selected.")
                 logging.warning(f"Invalid history menu option selected: {selected_option}")
 
-    def handle_easy_games(self):
-        self.display_game_history('txt_files/easy_game_history.txt')
-        return
-
-    def handle_medium_games(self):
-        self.display_game_history('txt_files/medium_game_history.txt')
-        return
-
-    def handle_hard_games(self):
-        self.display_game_history('txt_files/hard_game_history.txt')
-        return
-
     def handle_back(self):
         return "Back"
 
-    def display_game_history(self, file_path):
+    def handle_search_player(self):
+        self.clear_terminal()
+        prefix = input("Enter a player name (or the start of one): ").strip()
+        message = f"GAMES PLAYED BY {prefix.upper()}*"
+        print(message)
+        print("=" * len(message))
+        print("Format = Player Name, date-time, Winner, Loser, Game time, Game Turns")
+        print("=" * len(message))
+        pattern = re.compile(r"[\'\[\]]")
+        found = 0
+        for difficulty, (file_path, _) in DIFFICULTIES.items():
+            for line in get_name_index(file_path).read_matches(prefix):
+                found += 1
+                print(f"{difficulty:<7} {pattern.sub('', line)}")
+        if not found:
+            print("No games found.")
+        input("\nPress Enter to continue...")
+        return
+
+    def display_game_history(self, difficulty):
+        file_path, _ = DIFFICULTIES[difficulty]
         self.clear_terminal()
-        message = f"LIST OF {file_path.split('_')[1].upper()} GAMES PLAYED"
+        message = f"LIST OF {difficulty.upper()} GAMES PLAYED"
         print(message)
         print("=" * len(message))
         print("Format = Player Name, date-time, Winner, Loser, Game time, Game Turns")
@@ -283,7 +328,8 @@ class SubMenu_Leaderboard(MenuSystem):
         super().__init__(options)
         self.title = title
         self.in_menu = "SubMenu_Lead"
-        self.option_handlers = {option: getattr(self, f"handle_{option.lower().replace(' ', '_')}") for option in self.options}
+        difficulty_handlers = {f"{difficulty} Leaderboard": functools.partial(self.display_leaderboard, difficulty) for difficulty in DIFFICULTIES}
+        self.option_handlers = {option: difficulty_handlers.get(option) or getattr(self, f"handle_{option.lower().replace(' ', '_')}") for option in self.options}
 
     @log_function_call
     @handle_errors
@@ -308,22 +354,49 @@ class SubMenu_Leaderboard(MenuSystem):
                 print("Invalid option selected.")
                 logging.warning(f"Invalid leaderboard menu option selected: {selected_option}")
 
-    def handle_easy_leaderboard(self):
-        self.display_leaderboard('txt_files/easy_game_history.txt', "EASY GAME LEADERBOARD")
+    def handle_back(self):
+        return "Back"
+
+    def handle_overall_leaderboard(self):
+        self.clear_terminal()
+        title = "OVERALL LEADERBOARD (ALL DIFFICULTIES)"
+        print(title)
+        print("=" * len(title))
+        print("Score = share of empty cells fired at before winning, lower is better")
+        print("=" * len(title))
+        # Only build as many rows as fit on the screen
+        rows = max(self.get_terminal_size().lines - 6, 5)
+        print_overall_leaderboard(rows)
+        input("\nPress Enter to go back.")
         return
 
-    def handle_medium_leaderboard(self):
-        self.display_leaderboard('txt_files/medium_game_history.txt', "MEDIUM GAME LEADERBOARD")
+    def handle_daily_leaderboard(self):
+        self.display_windowed_leaderboard('Daily', "TOP GAMES OF THE LAST 24 HOURS")
         return
 
-    def handle_hard_leaderboard(self):
-        self.display_leaderboard('txt_files/hard_game_history.txt', "HARD GAME LEADERBOARD")
+    def handle_weekly_leaderboard(self):
+        self.display_windowed_leaderboard('Weekly', "TOP GAMES OF THE LAST 7 DAYS")
         return
 
-    def handle_back(self):
-        return "Back"
+    def handle_monthly_leaderboard(self):
+        self.display_windowed_leaderboard('Monthly', "TOP GAMES OF THE LAST 30 DAYS")
+        return
+
+    def display_windowed_leaderboard(self, window_name, title):
+        self.clear_terminal()
+        print(title)
+        print("=" * len(title))
+        print("Format = Player Name, date-time, Winner, Loser, Game time, Game Turns")
+        for difficulty, (file_path, _) in DIFFICULTIES.items():
+            print(f"\n{difficulty.upper()}")
+            print("-" * len(difficulty))
+            print_windowed_leaderboard(file_path, window_name)
+        input("\nPress Enter to go back.")
+        return
 
-    def display_leaderboard(self, file_path, title):
+    def display_leaderboard(self, difficulty):
+        file_path, _ = DIFFICULTIES[difficulty]
+        title = f"{difficulty.upper()} GAME LEADERBOARD"
         self.clear_terminal()
         print(title)
         print("=" * len(title))
@@ -365,12 +438,13 @@ class SubMenu(MenuSystem):
                 logging.warning(f"Invalid submenu option selected: {selected_option}")
 
     def handle_singleplayer(self):
-        singeplayermenu = SingleplayerMenu("Difficulty Selection", ["Easy", "Medium", "Hard", "Back"])
+        singeplayermenu = SingleplayerMenu("Difficulty Selection", list(DIFFICULTIES) + ["Back"])
         return singeplayermenu.handle_selection()
 
     def handle_multiplayer(self):
         self.clear_terminal()
         game_loop_setup()
+        memprofile.checkpoint("multiplayer game")
         input("Press Enter to continue...")
         return
 
@@ -383,7 +457,9 @@ class SingleplayerMenu(MenuSystem):
         super().__init__(options)
         self.title = title
         self.in_menu = "Singleplayer"
-        self.option_handlers = {option: getattr(self, f"handle_{self.format_option(option)}") for option in self.options}
+        difficulty_handlers = {difficulty: functools.partial(self.start_game, difficulty, size=size, history_file=history_file)
+                               for difficulty, (history_file, size) in DIFFICULTIES.items()}
+        self.option_handlers = {option: difficulty_handlers.get(option) or getattr(self, f"handle_{self.format_option(option)}") for option in self.options}
         self.player_stats = {}
 
     def format_option(self, option):
@@ -416,15 +492,6 @@ class SingleplayerMenu(MenuSystem):
                 print("Invalid option selected.")
                 logging.warning(f"Invalid singleplayer menu option selected: {selected_option}")
 
-    def handle_easy(self):
-        return self.start_game(difficulty='Easy', size=5, history_file='txt_files/easy_game_history.txt')
-
-    def handle_medium(self):
-        return self.start_game(difficulty='Medium', size=6, history_file='txt_files/medium_game_history.txt')
-
-    def handle_hard(self):
-        return self.start_game(difficulty='Hard', size=7, history_file='txt_files/hard_game_history.txt')
-
     def handle_back(self):
         return "Back"
 
@@ -437,30 +504,73 @@ class SingleplayerMenu(MenuSystem):
         """
         Encapsulates the game starting logic for different difficulty levels.
         """
-        username = input("Enter your username: ")
-        user_board = Board(size, size)
-        user_board.place_ships_random()
-
-        ai_board = Board(size, size)
-        ai_board.place_ships_random()
+        try:
+            check_fleet_fits(size, size, Ship_Classes)
+        except ValueError as e:
+            print(f"Can't start a {difficulty} game: {e}.")
+            logging.error(f"Fleet doesn't fit the {difficulty} board: {e}")
+            input("\nPress Enter to continue...")
+            return
 
-        targeting_system = TargetingSystem(ai_board)
-        ai = PseudoAI(ai_board, user_board)
+        username = input("Enter your username: ")
+        save_path = snapshot_path(username, difficulty)
+
+        resumed = None
+        if os.path.exists(save_path):
+            if input("You have a saved game on this difficulty. Resume it? (y/n): ").lower() == 'y':
+                try:
+                    resumed = load_snapshot(save_path, strategy_for_difficulty(difficulty, size, size))
+                except (OSError, ValueError) as e:
+                    print(f"Could not load saved game: {e}")
+                    logging.error(f"Could not load saved game {save_path}: {e}")
+            else:
+                delete_snapshot(save_path)
+
+        # Observers of the game engine: history, stats and the log
+        bus = EventBus()
+        bus.subscribe(GameOver, lambda event: self.record_result(difficulty, username, history_file, event))
+        bus.subscribe(Sunk, lambda event: logging.info(f"{event.shooter} sank a {event.ship} on {difficulty}"))
+        bus.subscribe(GameOver, lambda event: logging.info(f"{difficulty} game over for {username}: {event}"))
+
+        if resumed:
+            user_board, ai_board, targeting_system, ai, player_tries, elapsed = resumed
+            ai.move_budget = INTERACTIVE_MOVE_BUDGET
+            game_loop(user_board, ai_board, targeting_system, ai, save_path, player_tries, elapsed, bus)
+        else:
+            # Boards come ready-made from the background pool
+            board_pool = get_board_pool(Board)
+            user_board = board_pool.take(size)
+            ai_board = board_pool.take(size)
+            log_pool_stats(Board)
 
-        game_result = game_loop(user_board, ai_board, targeting_system, ai)
+            targeting_system = TargetingSystem(ai_board)
+            ai = PseudoAI(ai_board, user_board, strategy_for_difficulty(difficulty, size, size), INTERACTIVE_MOVE_BUDGET)
 
-        # Store instantly in a txt file
-        with open(history_file, 'a') as file:
-            timenow = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-            game_result.insert(0, timenow)
-            game_result.insert(0, username)
-            file.write(f"{game_result}\n")
+            game_loop(user_board, ai_board, targeting_system, ai, save_path, bus=bus)
 
+        memprofile.checkpoint(f"{difficulty} game")
         input("\nPress Enter to continue...")
         return
 
+    def record_result(self, difficulty, username, history_file, event):
+        """GameOver subscriber: only finished games reach the history, quits stay in their save"""
+        # Store instantly in a txt file (locked append, safe across processes)
+        timenow = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        game_result = [username, timenow, event.winner, event.loser, event.time_elapsed, event.shots]
+        append_record(history_file, game_result)
+        PlayerStatsStore().record_game(difficulty, username, game_result)
+        get_name_index(history_file)  # Index the new record right away
+        if event.winner == 'Player':  # Only a win is the player's placement
+            print(f"\n{placement_message(history_file, event.shots, event.time_elapsed)} on {difficulty}")
+
 # Entry Point
 if __name__ == "__main__":
+    # Long-running kiosks can prove memory stays flat, the report is printed on exit
+    if '--memprofile' in sys.argv[1:]:
+        memprofile.enable()
+
+    # Start filling the board pools while the player is still in the menus
+    get_board_pool(Board, sizes=tuple(size for _, size in DIFFICULTIES.values()))
     main_menu = MainMenu()
     main_menu.handle_selection()
 
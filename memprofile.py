@@ -0,0 +1,84 @@
+import atexit
+import fnmatch
+import linecache
+import sys
+import tracemalloc
+
+# Allocations made by the profiler itself and by imports aren't interesting
+IGNORED_FILES = (tracemalloc.__file__, fnmatch.__file__, linecache.__file__, '<frozen importlib._bootstrap>',
+                 '<frozen importlib._bootstrap_external>', '<unknown>')
+
+class MemoryProfiler:
+    """
+    Takes tracemalloc snapshots at checkpoints (each game, each menu
+    transition) and reports where memory grew between the first
+    checkpoint and the last.
+    """
+
+    def __init__(self, top=10, stream=None):
+        self.top = top
+        self.stream = stream or sys.stderr
+        self.checkpoints = []  # (label, traced bytes) per checkpoint
+        self.first = None
+        self.last = None
+        tracemalloc.start()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES])
+
+    def checkpoint(self, label):
+        # Only the first and latest snapshots are kept, so profiling stays flat itself
+        snapshot = self.snapshot()
+        if self.first is None:
+            self.first = snapshot
+        self.last = snapshot
+        current, _ = tracemalloc.get_traced_memory()
+        self.checkpoints.append((label, current))
+        if len(self.checkpoints) > 10_000:
+            del self.checkpoints[1:5_000]  # Keep the start and the recent history
+
+    def report(self):
+        if self.first is None:
+            return
+        self.checkpoint("exit")
+        out = self.stream
+        _, peak = tracemalloc.get_traced_memory()
+        print(f"\nMemory profile: {len(self.checkpoints)} checkpoints, peak {peak / 1024:.1f} KiB", file=out)
+        for label, current in self.checkpoints[-20:]:
+            print(f"  {current / 1024:10.1f} KiB  {label}", file=out)
+
+        print(f"\nTop {self.top} growth sites since '{self.checkpoints[0][0]}':", file=out)
+        for stat in self.last.compare_to(self.first, 'lineno')[:self.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            print(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+7} blocks  {frame.filename}:{frame.lineno}", file=out)
+            line = linecache.getline(frame.filename, frame.lineno).strip()
+            if line:
+                print(f"      {line}", file=out)
+
+_profiler = None
+
+def enable(top=10, stream=None):
+    """Starts profiling for the rest of the process, the report is printed on exit"""
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(top, stream)
+        _profiler.checkpoint("start")
+        atexit.register(_profiler.report)
+    return _profiler
+
+def checkpoint(label):
+    """Records a checkpoint, free when profiling isn't enabled"""
+    if _profiler is not None:
+        _profiler.checkpoint(label)
+
+if __name__ == "__main__":
+
+    # Usage example: a leak shows up as the top growth site
+    enable()
+    leak = []
+    for game in range(5):
+        leak.extend(str(i) * 10 for i in range(2000))
+        checkpoint(f"game {game + 1}")
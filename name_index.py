@@ -0,0 +1,112 @@
+import ast
+import fcntl
+import os
+
+from history import history_replaced, read_lines_from
+from player_stats import normalize_name
+
+POSTINGS = ''  # Trie key holding the record offsets of names that end at a node
+
+class NameIndex:
+    """
+    Prefix trie from normalized player names to record offsets in one history file.
+
+    The postings are persisted in a sidecar file next to the history
+    ("start<TAB>end<TAB>name" per record). update() only reads the bytes
+    appended to the history since the last indexed record, so keeping the
+    index current costs time proportional to the new games. A search walks
+    to the prefix node and then seeks straight to each matching record.
+    """
+
+    def __init__(self, history_path):
+        self.history_path = history_path
+        self.index_path = os.path.splitext(history_path)[0] + '.names'
+        self.root = {}
+        self.indexed_to = 0  # Byte offset in the history covered by the index
+        self.sidecar_pos = 0  # Byte offset in the sidecar already loaded
+        self.history_id = None  # file_identity of the history file being indexed
+
+    def _add(self, name, offset):
+        node = self.root
+        for char in name:
+            node = node.setdefault(char, {})
+        node.setdefault(POSTINGS, []).append(offset)
+
+    def update(self):
+        """Load postings written by other processes, then index any new history records"""
+        if not os.path.exists(self.history_path):
+            return
+        with open(self.index_path, 'a+') as sidecar:
+            fcntl.flock(sidecar, fcntl.LOCK_EX)
+            try:
+                if history_replaced(self, sidecar):
+                    self.root = {}
+                    self.indexed_to = 0
+                    self.sidecar_pos = 0
+
+                sidecar.seek(self.sidecar_pos)
+                for line in iter(sidecar.readline, ''):
+                    start, end, name = line.rstrip('\n').split('\t', 2)
+                    self._add(name, int(start))
+                    self.indexed_to = max(self.indexed_to, int(end))
+
+                new_postings = []
+                for start, end, line in read_lines_from(self.history_path, self.indexed_to):
+                    self.indexed_to = end
+                    try:
+                        record = ast.literal_eval(line.strip())
+                        name = normalize_name(str(record[0]))
+                    except Exception:
+                        continue  # Blank or torn line, nothing to index
+                    self._add(name, start)
+                    new_postings.append(f"{start}\t{end}\t{name}\n")
+
+                sidecar.write("".join(new_postings))
+                sidecar.flush()
+                self.sidecar_pos = sidecar.tell()
+            finally:
+                fcntl.flock(sidecar, fcntl.LOCK_UN)
+
+    def search(self, prefix):
+        """Offsets of every record whose player name starts with prefix, in file order"""
+        node = self.root
+        for char in normalize_name(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+
+        offsets = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == POSTINGS:
+                    offsets.extend(child)
+                else:
+                    stack.append(child)
+        return sorted(offsets)
+
+    def read_matches(self, prefix):
+        """The matching record lines themselves"""
+        lines = []
+        with open(self.history_path, 'rb') as file:
+            for offset in self.search(prefix):
+                file.seek(offset)
+                lines.append(file.readline().decode(errors='replace').strip())
+        return lines
+
+_indexes = {}
+
+def get_name_index(history_path):
+    """One shared, up-to-date index per history file for the lifetime of the process"""
+    if history_path not in _indexes:
+        _indexes[history_path] = NameIndex(history_path)
+    index = _indexes[history_path]
+    index.update()
+    return index
+
+if __name__ == "__main__":
+
+    # Usage example
+    for record in get_name_index('txt_files/easy_game_history.txt').read_matches('co'):
+        print(record)
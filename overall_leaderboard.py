@@ -0,0 +1,73 @@
+import ast
+import bisect
+import heapq
+import re
+from itertools import islice
+
+from board import Ship_Classes
+from history import history_replaced, read_lines_from
+from leaderboard import DIFFICULTIES, time_to_seconds
+
+FLEET_CELLS = sum(Ship_Classes.values())
+
+def normalized_score(shots, size):
+    """
+    Share of the empty water the player had to shoot before sinking the fleet:
+    0.0 is a perfect game on any board size, 1.0 means every cell was fired at.
+    """
+    return (shots - FLEET_CELLS) / (size * size - FLEET_CELLS)
+
+class SortedRun:
+    """
+    The won games of one difficulty, kept sorted by (score, seconds).
+    New records are tailed from the history file and bisected into place,
+    so the run never needs a full re-sort.
+    """
+
+    def __init__(self, difficulty, history_path, size):
+        self.difficulty = difficulty
+        self.history_path = history_path
+        self.size = size
+        self.rows = []  # (score, seconds, sequence number, difficulty, record)
+        self.offset = 0
+        self.history_id = None
+
+    def refresh(self):
+        if history_replaced(self):
+            self.rows = []
+            self.offset = 0
+        for _, end, line in read_lines_from(self.history_path, self.offset):
+            self.offset = end
+            try:
+                record = ast.literal_eval(line.strip())
+                if record[2] != 'Player':
+                    continue  # Only won games have a comparable score
+                row = (normalized_score(record[5], self.size), time_to_seconds(record[4]), end, self.difficulty, record)
+            except Exception:
+                continue
+            bisect.insort(self.rows, row)
+        return self.rows
+
+_runs = {}
+
+def overall_leaderboard(count):
+    """Lazily k-way merge every difficulty's run, producing only the first count rows"""
+    runs = []
+    for difficulty, (history_path, size) in DIFFICULTIES.items():
+        if difficulty not in _runs:
+            _runs[difficulty] = SortedRun(difficulty, history_path, size)
+        runs.append(_runs[difficulty].refresh())
+    return list(islice(heapq.merge(*runs), count))
+
+def print_overall_leaderboard(count=10):
+    pattern = re.compile(r"[\'\[\]]")
+    rows = overall_leaderboard(count)
+    if not rows:
+        print("No games won yet.")
+    for idx, (score, _, _, difficulty, record) in enumerate(rows):
+        print(f"{idx+1}. [{difficulty}, score {score:.2f}] {pattern.sub('', str(record))}")
+
+if __name__ == "__main__":
+
+    # Usage example
+    print_overall_leaderboard()
@@ -0,0 +1,247 @@
+import json
+import random
+
+# Whole-layout rejection sampling is tried this many times before falling back to the solver
+MAX_REJECTION_ATTEMPTS = 2000
+# Nodes the layout search may visit (roughly 10 microseconds each) before giving up
+SEARCH_NODE_LIMIT = 200_000
+RESERVED_LETTERS = {' ', 'X', 'O'}  # Empty, hit and miss cells
+
+def load_fleet(path):
+    """
+    Reads a fleet from a JSON config file, e.g.
+    {"Carrier": {"length": 5, "letter": "C"}, "Destroyer": {"length": 2, "letter": "D"}}
+    Returns (ship classes, ship letters) in the same shape as Ship_Classes and Ship_Letters.
+    """
+    with open(path, 'r') as file:
+        config = json.load(file)
+
+    classes, letters = {}, {}
+    for name, spec in config.items():
+        length, letter = int(spec['length']), str(spec['letter'])
+        if length < 1:
+            raise ValueError(f"Ship {name} must have a length of at least 1")
+        # The board renders and saves cells as single-byte ASCII
+        if (len(letter) != 1 or not (letter.isascii() and letter.isprintable())
+                or letter in RESERVED_LETTERS or letter in letters.values()):
+            raise ValueError(f"Ship {name} needs its own single printable ASCII letter other than ' ', 'X' and 'O'")
+        classes[name] = length
+        letters[name] = letter
+    if not classes:
+        raise ValueError(f"{path} doesn't define any ships")
+    return classes, letters
+
+def _placements(height, width, length):
+    """Every (bitmask, cells) a ship of this length can occupy on an empty board"""
+    placements = []
+    for row in range(height):
+        for col in range(width):
+            if col + length <= width:
+                cells = [(row, col + i) for i in range(length)]
+                placements.append((sum(1 << (r * width + c) for r, c in cells), cells))
+            if length > 1 and row + length <= height:
+                cells = [(row + i, col) for i in range(length)]
+                placements.append((sum(1 << (r * width + c) for r, c in cells), cells))
+    return placements
+
+def _rejection_sample(ships, placements, rng):
+    """
+    Pick every ship's placement independently and uniformly, and keep the
+    layout only if nothing overlaps. Accepted layouts are exactly uniform
+    over all valid layouts.
+    """
+    for _ in range(MAX_REJECTION_ATTEMPTS):
+        occupied = 0
+        layout = {}
+        for ship in ships:
+            mask, cells = rng.choice(placements[ship])
+            if mask & occupied:
+                break
+            occupied |= mask
+            layout[ship] = cells
+        else:
+            return layout
+    return None
+
+class SearchLimitReached(Exception):
+    pass
+
+class _FleetSearch:
+    """
+    Randomized exact-cover search for a layout of ships with the given lengths.
+
+    Cells are decided in order: the first undecided cell either stays
+    empty or becomes the top/left end of a ship. Ships of the same length
+    are interchangeable, so a state is just (decided cells, remaining
+    lengths) and states that can't be completed are remembered. A state
+    is also dropped as soon as the free cells that some remaining ship
+    could still cover are fewer than the remaining ship area.
+    """
+
+    def __init__(self, height, width, lengths, rng, node_limit=SEARCH_NODE_LIMIT):
+        self.width = width
+        self.full = (1 << height * width) - 1
+        self.rng = rng
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.failed = set()
+        # Cells a ship of this length can start from lying across
+        self.across_starts = {length: sum(1 << row * width + col for row in range(height) for col in range(width - length + 1))
+                              for length in set(lengths)}
+
+    def _starts(self, free, length):
+        """Bitmasks of the free cells a ship can start from, across and down"""
+        across, down = free, free
+        for i in range(1, length):
+            across &= free >> i
+            down &= free >> i * self.width
+        return across & self.across_starts[length], down if length > 1 else 0
+
+    def search(self, decided, lengths):
+        """lengths is sorted, returns [(length, mask), ...] or None if nothing fits"""
+        if not lengths:
+            return []
+        key = (decided, lengths)
+        if key in self.failed:
+            return None
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise SearchLimitReached
+
+        free = self.full & ~decided
+        area = sum(lengths)
+        # Free cells outside every spot the shortest ship fits can never be used
+        across, down = self._starts(free, lengths[0])
+        usable = 0
+        for i in range(lengths[0]):
+            usable |= across << i | down << i * self.width
+        if usable.bit_count() < area:
+            self.failed.add(key)
+            return None
+
+        cell = free & -free
+        branches = []
+        for length in sorted(set(lengths)):
+            if length != lengths[0]:
+                across, down = self._starts(free, length)
+                if not across | down:
+                    self.failed.add(key)
+                    return None
+            if across & cell:
+                branches.append((length, sum(cell << i for i in range(length))))
+            if down & cell:
+                branches.append((length, sum(cell << i * self.width for i in range(length))))
+        if (usable & ~cell).bit_count() >= area:
+            branches.append((0, cell))  # Leave it empty
+        self.rng.shuffle(branches)
+
+        for length, mask in branches:
+            rest = lengths
+            if length:
+                i = lengths.index(length)
+                rest = lengths[:i] + lengths[i + 1:]
+            layout = self.search(decided | mask, rest)
+            if layout is not None:
+                if length:
+                    layout.append((length, mask))
+                return layout
+
+        self.failed.add(key)
+        return None
+
+def _search_layout(height, width, fleet, rng):
+    """{ship: cells} from _FleetSearch, or None if the fleet can't fit"""
+    search = _FleetSearch(height, width, fleet.values(), rng)
+    found = search.search(0, tuple(sorted(fleet.values())))
+    if found is None:
+        return None
+    masks = {}
+    for length, mask in found:
+        masks.setdefault(length, []).append(mask)
+    layout = {}
+    for ship, length in fleet.items():
+        mask = masks[length].pop(rng.randrange(len(masks[length])))
+        layout[ship] = [divmod(index, width) for index in range(height * width) if mask >> index & 1]
+    return layout
+
+_feasible = {}
+
+def check_fleet_fits(height, width, fleet):
+    """Raises ValueError if the fleet can't be placed on the board at all (cached per board and fleet)"""
+    key = (height, width, tuple(fleet.items()))
+    if key not in _feasible:
+        _feasible[key] = None
+        if sum(fleet.values()) > height * width:
+            _feasible[key] = f"needs {sum(fleet.values())} cells but the board only has {height * width}"
+        elif max(fleet.values()) > max(height, width):
+            _feasible[key] = f"has a ship longer than the {height}x{width} board"
+        else:
+            try:
+                if _search_layout(height, width, fleet, random.Random(0)) is None:
+                    _feasible[key] = f"can't be arranged on a {height}x{width} board without overlapping"
+            except SearchLimitReached:
+                _feasible[key] = f"is too crowded to arrange on a {height}x{width} board in reasonable time"
+    if _feasible[key]:
+        raise ValueError(f"This fleet {_feasible[key]}")
+
+def solve_placement(height, width, fleet, rng=None):
+    """
+    Places every ship in fleet ({name: length}) and returns {name: [(row, col), ...]}.
+
+    Roomy fleets are sampled exactly uniformly by whole-layout rejection.
+    Dense fleets where that keeps failing go to a randomized exact-cover
+    search, which always finds a layout but isn't exactly uniform. A fleet that can't fit raises
+    ValueError before any search is attempted.
+    """
+    rng = rng or random
+    check_fleet_fits(height, width, fleet)
+
+    placements = {ship: _placements(height, width, length) for ship, length in fleet.items()}
+    layout = _rejection_sample(tuple(fleet), placements, rng)
+    if layout is None:
+        try:
+            layout = _search_layout(height, width, fleet, rng)
+        except SearchLimitReached:
+            # check_fleet_fits found one within the limit with this seed
+            layout = _search_layout(height, width, fleet, random.Random(0))
+    return {ship: layout[ship] for ship in fleet}
+
+if __name__ == "__main__":
+
+    # A fleet letter the renderer and snapshots can't handle is rejected
+    import os
+    import tempfile
+    import time
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False) as config:
+        json.dump({"Carrier": {"length": 5, "letter": "\u03a9"}}, config)
+    try:
+        load_fleet(config.name)
+        raise AssertionError("a non-ASCII fleet letter was accepted")
+    except ValueError as e:
+        print(f"Rejected: {e}")
+    finally:
+        os.unlink(config.name)
+
+    # Time the default fleet, a dense "blitz" fleet that fills most of the board,
+    # and fleets of threes and twos that leave at most one cell of the 7x7 board free
+
+    fleets = {
+        'standard': {'Carrier': 5, 'Battleship': 4, 'Cruiser': 3, 'Submarine': 3, 'Destroyer': 2},
+        'blitz': {f"Ship{i}": length for i, length in enumerate([5, 5, 4, 4, 3, 3, 2])},
+        'threes': {f"Ship{i}": 3 for i in range(16)},
+        'mixed': {f"Ship{i}": 3 if i < 11 else 2 for i in range(17)},
+    }
+    for name, fleet in fleets.items():
+        for size in (5, 6, 7):
+            try:
+                start = time.perf_counter()
+                check_fleet_fits(size, size, fleet)
+                checked = time.perf_counter() - start
+                start = time.perf_counter()
+                for _ in range(200):
+                    solve_placement(size, size, fleet)
+                print(f"{name:<9}{size}x{size}: checked in {checked * 1e3:.2f} ms, "
+                      f"{(time.perf_counter() - start) / 200 * 1e3:.2f} ms per layout")
+            except ValueError as e:
+                print(f"{name:<9}{size}x{size}: {e}")
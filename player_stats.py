@@ -0,0 +1,135 @@
+import dbm
+import fcntl
+import math
+import os
+import struct
+
+from leaderboard import time_to_seconds
+
+STATS_PATH = 'txt_files/player_stats'
+DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+
+# games, wins, shots mean, shots M2, time mean, time M2, best shots, best time (0 = no win yet)
+RECORD_FORMAT = struct.Struct('<IIddddII')
+
+def normalize_name(name):
+    return " ".join(name.strip().lower().split())
+
+class PlayerStats:
+    """Running aggregates for one player on one difficulty (Welford's algorithm)"""
+
+    def __init__(self, games=0, wins=0, shots_mean=0.0, shots_m2=0.0, time_mean=0.0, time_m2=0.0, best_shots=0, best_time=0):
+        self.games = games
+        self.wins = wins
+        self.shots_mean = shots_mean
+        self.shots_m2 = shots_m2
+        self.time_mean = time_mean
+        self.time_m2 = time_m2
+        self.best_shots = best_shots
+        self.best_time = best_time
+
+    def update(self, won, shots, seconds):
+        """Fold one finished game into the aggregate in O(1)"""
+        self.games += 1
+        if won:
+            self.wins += 1
+            if self.best_shots == 0 or shots < self.best_shots:
+                self.best_shots = shots
+            if self.best_time == 0 or seconds < self.best_time:
+                self.best_time = seconds
+
+        delta = shots - self.shots_mean
+        self.shots_mean += delta / self.games
+        self.shots_m2 += delta * (shots - self.shots_mean)
+
+        delta = seconds - self.time_mean
+        self.time_mean += delta / self.games
+        self.time_m2 += delta * (seconds - self.time_mean)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def shots_stddev(self):
+        return math.sqrt(self.shots_m2 / (self.games - 1)) if self.games > 1 else 0.0
+
+    @property
+    def time_stddev(self):
+        return math.sqrt(self.time_m2 / (self.games - 1)) if self.games > 1 else 0.0
+
+    def pack(self):
+        return RECORD_FORMAT.pack(self.games, self.wins, self.shots_mean, self.shots_m2,
+                                  self.time_mean, self.time_m2, self.best_shots, self.best_time)
+
+    @classmethod
+    def unpack(cls, data):
+        return cls(*RECORD_FORMAT.unpack(data))
+
+class PlayerStatsStore:
+    """
+    Key/value store of PlayerStats keyed by "difficulty:player".
+
+    Each lookup or update touches a single fixed-size record, so the cost
+    does not depend on how many games are in the history files.
+    """
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self.lock_path = path + '.lock'
+
+    def _key(self, difficulty, username):
+        return f"{difficulty}:{normalize_name(username)}".encode()
+
+    def get(self, difficulty, username):
+        if not os.path.exists(self.lock_path):
+            return None
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                with dbm.open(self.path, 'r') as db:
+                    data = db.get(self._key(difficulty, username))
+            except dbm.error:
+                return None
+        return PlayerStats.unpack(data) if data else None
+
+    def record_game(self, difficulty, username, game_result):
+        """Update stats from a start_game result [winner, loser, 'HH:MM:SS', shots]"""
+        winner, _, time_elapsed, shots = game_result[-4:]
+        if winner is None:
+            return None  # Unfinished games don't count, same as the leaderboards
+
+        key = self._key(difficulty, username)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with dbm.open(self.path, 'c') as db:
+                data = db.get(key)
+                stats = PlayerStats.unpack(data) if data else PlayerStats()
+                stats.update(winner == 'Player', shots, time_to_seconds(time_elapsed))
+                db[key] = stats.pack()
+        return stats
+
+def format_stats(difficulty, stats):
+    if stats is None:
+        return f"{difficulty:<7} no games played"
+    best = f"{stats.best_shots} shots, {stats.best_time}s" if stats.wins else "no wins yet"
+    return (f"{difficulty:<7} games {stats.games}, wins {stats.wins} ({stats.win_rate:.0%}), "
+            f"shots {stats.shots_mean:.1f} ± {stats.shots_stddev:.1f}, "
+            f"time {stats.time_mean:.0f}s ± {stats.time_stddev:.0f}s, best {best}")
+
+def print_player_stats(username, store=None):
+    store = store or PlayerStatsStore()
+    for difficulty in DIFFICULTIES:
+        print(format_stats(difficulty, store.get(difficulty, username)))
+
+if __name__ == "__main__":
+
+    # Usage example
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = PlayerStatsStore(os.path.join(tmp_dir, 'player_stats'))
+        store.record_game('Easy', 'Cole', ['Player', 'AI', '00:00:16', 25])
+        store.record_game('Easy', 'cole ', ['AI', 'Player', '00:00:31', 24])
+        store.record_game('Easy', 'COLE', ['Player', 'AI', '00:00:12', 21])
+        print_player_stats('cole', store)
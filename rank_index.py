@@ -0,0 +1,105 @@
+import ast
+import bisect
+import fcntl
+import os
+
+import numpy as np
+
+from history import history_replaced, read_lines_from
+from leaderboard import time_to_seconds
+
+# Each sidecar entry is the record's sort key and the history offset just after it
+ENTRY = np.dtype([('key', '<i8'), ('end', '<i8')])
+
+def rank_key(shots, seconds):
+    """Packs (shots, seconds) into one integer that sorts the same way"""
+    return (shots << 32) | seconds
+
+class RankIndex:
+    """
+    Sorted (shots, seconds) keys of every finished game in one history file,
+    in the same order as the leaderboard.
+
+    The keys are persisted as an append-only sidecar next to the history
+    file. Loading it sorts once, after that every new game is bisected
+    into place and a rank is one more bisection.
+    """
+
+    def __init__(self, history_path):
+        self.history_path = history_path
+        self.index_path = os.path.splitext(history_path)[0] + '.rank'
+        self.keys = []
+        self.indexed_to = 0
+        self.sidecar_pos = 0
+        self.history_id = None  # file_identity of the history file being indexed
+
+    def update(self):
+        """Pick up entries written by other processes, then index new history records"""
+        if not os.path.exists(self.history_path):
+            return
+        with open(self.index_path, 'a+b') as sidecar:
+            fcntl.flock(sidecar, fcntl.LOCK_EX)
+            try:
+                if history_replaced(self, sidecar):
+                    self.keys = []
+                    self.indexed_to = 0
+                    self.sidecar_pos = 0
+
+                sidecar.seek(self.sidecar_pos)
+                entries = np.frombuffer(sidecar.read(), dtype=ENTRY)
+                self.sidecar_pos += entries.nbytes
+                if len(entries):
+                    if len(entries) > 64:
+                        self.keys = sorted(self.keys + entries['key'].tolist())
+                    else:
+                        for key in entries['key'].tolist():
+                            bisect.insort(self.keys, key)
+                    self.indexed_to = max(self.indexed_to, int(entries['end'].max()))
+
+                new_entries = []
+                for _, end, line in read_lines_from(self.history_path, self.indexed_to):
+                    self.indexed_to = end
+                    try:
+                        record = ast.literal_eval(line.strip())
+                        if record[2] is None:
+                            continue  # Unfinished games aren't ranked
+                        key = rank_key(record[5], time_to_seconds(record[4]))
+                    except Exception:
+                        continue
+                    bisect.insort(self.keys, key)
+                    new_entries.append((key, end))
+
+                if new_entries:
+                    data = np.array(new_entries, dtype=ENTRY).tobytes()
+                    sidecar.seek(0, os.SEEK_END)
+                    sidecar.write(data)
+                    self.sidecar_pos = sidecar.tell()
+            finally:
+                fcntl.flock(sidecar, fcntl.LOCK_UN)
+
+    def rank_of(self, shots, seconds):
+        """
+        (rank, total) of a game that is already in the index. Equal games
+        rank in the order they were played, like on the leaderboard, so
+        the newest one is placed after the others.
+        """
+        return bisect.bisect_right(self.keys, rank_key(shots, seconds)), len(self.keys)
+
+_indexes = {}
+
+def get_rank_index(history_path):
+    if history_path not in _indexes:
+        _indexes[history_path] = RankIndex(history_path)
+    index = _indexes[history_path]
+    index.update()
+    return index
+
+def placement_message(history_path, shots, time_elapsed):
+    rank, total = get_rank_index(history_path).rank_of(shots, time_to_seconds(time_elapsed))
+    percentile = 100 * rank / total if total else 100
+    return f"You placed #{rank} of {total} (top {percentile:.0f}%)"
+
+if __name__ == "__main__":
+
+    # Usage example
+    print(placement_message('txt_files/easy_game_history.txt', 22, '00:00:19'))
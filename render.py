@@ -0,0 +1,109 @@
+import shutil
+
+import numpy as np
+
+from terminal_geometry import terminal_geometry
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+GAP = " " * 10
+
+# Cell code (the character's code point) -> centred 3-wide glyph. Only Latin-1 is
+# tabulated, render_cells formats anything above it cell by cell instead.
+GLYPHS = np.array([f"{chr(code):^3}" for code in range(256)], dtype=object)
+HIT_CODE, MISS_CODE = ord('X'), ord('O')
+BLANK_CODE = ord(' ')
+
+_templates = {}
+
+def _template(left_cols, right_cols):
+    """Column numbers and separator lines only depend on board sizes, so build them once"""
+    key = (left_cols, right_cols)
+    if key not in _templates:
+        separator = "   +" + "---+" * left_cols + GAP + "   +" + "---+" * right_cols
+        numbers = ("    " + " ".join(f"{i + 1:^3}" for i in range(left_cols)) + GAP + "     "
+                   + " ".join(f"{i + 1:^3}" for i in range(right_cols)))
+        labels = [f"{letter:^2}" for letter in ALPHABET]
+        _templates[key] = (numbers, separator, labels)
+    return _templates[key]
+
+def render_cells(grid, hide_ships=False):
+    """Turns a grid into one "|"-joined string per row"""
+    codes = np.ascontiguousarray(grid, dtype='U1').view(np.uint32)
+    if hide_ships:
+        codes = np.where((codes == HIT_CODE) | (codes == MISS_CODE), codes, BLANK_CODE)
+    if codes.size and codes.max() >= len(GLYPHS):
+        return ["|".join(f"{chr(code):^3}" for code in row) for row in codes.tolist()]
+    return ["|".join(row) for row in GLYPHS[codes].tolist()]
+
+def render_side_by_side(left_grid, right_grid, left_title, right_title, hide_left=False, hide_right=False, terminal_width=None):
+    """Builds the whole two-board screen as a single string"""
+    if terminal_width is None:
+        terminal_width = terminal_geometry().columns  # Cached between resizes
+
+    left_rows, left_cols = left_grid.shape
+    right_cols = right_grid.shape[1]
+    numbers, separator, labels = _template(left_cols, right_cols)
+
+    board_width = 5 * (left_cols + right_cols + 5)  # Approximate width of both boards with padding
+    pad = " " * max((terminal_width - board_width) // 2, 0)
+    title_gap = " " * ((3 * left_cols // 2 + 12) + (3 * right_cols // 2 - 4))
+    separator = pad + separator
+
+    lines = [pad + " " * (3 * left_cols // 2 + 1) + left_title + title_gap + right_title, pad + numbers, separator]
+    left_content = render_cells(left_grid, hide_left)
+    right_content = render_cells(right_grid, hide_right)
+    for row in range(left_rows):
+        lines.append(f"{pad}{labels[row]} |{left_content[row]}| {GAP}{labels[row]}|{right_content[row]}|")
+        lines.append(separator)
+    return "\n".join(lines)
+
+def _legacy_display_side_by_side(user_board, ai_board, hide_ships=False):
+    """The per-cell formatting this module replaced, kept for the benchmark"""
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    terminal_width = shutil.get_terminal_size((80, 20)).columns
+    board_width = 5 * (user_board.width + ai_board.width + 5)
+    side_padding = max((terminal_width - board_width) // 2, 0)
+
+    print(" " * side_padding + " "*(3*user_board.width//2 + 1) +"YOUR BOARD"+ " " * ((3*user_board.width//2 + 12) + (3* ai_board.width//2 -4))  + "OPPONENT'S BOARD")
+    print(" " * side_padding + "    " + " ".join(f"{i + 1:^3}" for i in range(user_board.height)) + " " * 10 + "     " + " ".join(f"{i + 1:^3}" for i in range(ai_board.height)))
+    print(" " * side_padding + "   +" + "---+" * user_board.width + " " * 10 + "   +" + "---+" * ai_board.width)
+
+    for row_num in range(user_board.height):
+        user_row_content = "|".join(f"{str(cell):^3}" for cell in user_board.grid[row_num])
+        ai_row_content = "|".join(f"{str(cell):^3}" for cell in ai_board.grid[row_num])
+        if hide_ships:
+            user_row_content = "|".join(f"{str(cell) if cell in ['X', 'O'] else ' ':^3}" for cell in user_board.grid[row_num])
+            ai_row_content = "|".join(f"{str(cell) if cell in ['X', 'O'] else ' ':^3}" for cell in ai_board.grid[row_num])
+        print(f"{' ' * side_padding}{alphabet[row_num]:^2} |{user_row_content}| {' ' * 10}{alphabet[row_num]:^2}|{ai_row_content}|")
+        print(" " * side_padding + "   +" + "---+" * user_board.width + " " * 10 + "   +" + "---+" * ai_board.width)
+
+if __name__ == "__main__":
+
+    # Benchmark against the old formatter and check the output is identical
+    import contextlib
+    import io
+    import timeit
+
+    from board import Board, display_side_by_side
+
+    for size in (5, 7, 10, 16, 26):
+        user_board = Board(size, size)
+        ai_board = Board(size, size)
+        for board in (user_board, ai_board):
+            board.grid[np.random.rand(size, size) < 0.3] = 'C'
+            board.grid[np.random.rand(size, size) < 0.2] = 'X'
+            board.grid[np.random.rand(size, size) < 0.2] = 'O'
+
+        for hide_ships in (False, True):
+            old_out, new_out = io.StringIO(), io.StringIO()
+            with contextlib.redirect_stdout(old_out):
+                _legacy_display_side_by_side(user_board, ai_board, hide_ships)
+            with contextlib.redirect_stdout(new_out):
+                display_side_by_side(user_board, ai_board, hide_ships)
+            assert old_out.getvalue() == new_out.getvalue(), f"Output differs for {size}x{size}"
+
+        runs = 500
+        with contextlib.redirect_stdout(io.StringIO()):
+            old_time = timeit.timeit(lambda: _legacy_display_side_by_side(user_board, ai_board, True), number=runs) / runs
+            new_time = timeit.timeit(lambda: display_side_by_side(user_board, ai_board, True), number=runs) / runs
+        print(f"{size:>2}x{size:<2} legacy {old_time * 1e6:8.1f} us   templated {new_time * 1e6:8.1f} us   ({old_time / new_time:.1f}x)")
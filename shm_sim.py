@@ -0,0 +1,131 @@
+import argparse
+import multiprocessing
+import pickle
+import random
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_sim import BATCH_STRATEGIES, BatchGames, place_fleets
+from board import Board, PseudoAI, Ship_Classes, Ship_Letters
+from strategies import STRATEGIES, create_strategy
+
+# The only thing sent to a worker per task: which games to play and how
+Task = namedtuple('Task', 'start stop strategy seed sequential budget')
+
+# Games per task, big enough that a task's work dwarfs its dispatch
+CHUNK_GAMES = 8192
+SEQUENTIAL_CHUNK_GAMES = 256  # Move-by-move games are far slower, keep the load balanced
+
+def create_shared(shape, dtype):
+    """A new shared memory block and the array viewing it"""
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+# Set in each worker by _attach, the blocks stay mapped for the worker's lifetime
+_boards = None
+_results = None
+_blocks = []
+
+def _attach(boards_name, results_name, shape):
+    global _boards, _results
+    boards_shm = shared_memory.SharedMemory(name=boards_name)
+    results_shm = shared_memory.SharedMemory(name=results_name)
+    _blocks.extend([boards_shm, results_shm])
+    _boards = np.ndarray(shape, dtype=np.int8, buffer=boards_shm.buf)
+    _results = np.ndarray(shape[:1], dtype=np.int16, buffer=results_shm.buf)
+
+def board_from_ship_ids(ship_ids):
+    """A Board with its ships placed as in a ship-id grid (k = k-th ship of the fleet)"""
+    height, width = ship_ids.shape
+    board = Board(width, height)
+    for ship, name in enumerate(Ship_Classes, start=1):
+        cells = np.argwhere(ship_ids == ship)
+        board.grid[ship_ids == ship] = Ship_Letters[name]
+        board.ship_positions[name] = [(int(row), int(col)) for row, col in cells]
+    return board
+
+def _play_task(task):
+    """Plays games task.start to task.stop straight from shared memory, writing shots in place"""
+    boards = _boards[task.start:task.stop]  # A view, nothing is copied
+    if not task.sequential:
+        games, height, width = boards.shape
+        rng = np.random.default_rng([task.seed, task.start])
+        strategy = BATCH_STRATEGIES[task.strategy](games, height, width, rng)
+        _results[task.start:task.stop] = BatchGames(boards).run(strategy)
+    else:
+        for index, ship_ids in enumerate(boards, start=task.start):
+            height, width = ship_ids.shape
+            target_board = board_from_ship_ids(ship_ids)
+            strategy = create_strategy(task.strategy, height, width, random.Random(task.seed + index))
+            ai = PseudoAI(Board(width, height), target_board, strategy, task.budget)
+            while not ai.game_over:
+                ai.fire()
+            _results[index] = ai.tries
+    return task.stop - task.start
+
+def simulate_shared(strategy_name, games, size, seed=0, processes=None, chunk_games=None,
+                    sequential=False, budget=None):
+    """
+    Plays `games` games of one strategy across a process pool and returns
+    the shots each took. Strategies come from batch_sim, or with
+    sequential=True from the registry in strategies.py, played move by
+    move through PseudoAI with up to `budget` seconds per move.
+
+    The boards and the results live in shared memory allocated here.
+    Workers map both once when they start, read their games in place and
+    write results in place, so each task only carries a Task tuple.
+    """
+    chunk_games = chunk_games or (SEQUENTIAL_CHUNK_GAMES if sequential else CHUNK_GAMES)
+    shape = (games, size, size)
+    boards_shm, boards = create_shared(shape, np.int8)
+    results_shm, results = create_shared(shape[:1], np.int16)
+    try:
+        rng = np.random.default_rng(seed)
+        for start in range(0, games, CHUNK_GAMES):
+            stop = min(start + CHUNK_GAMES, games)
+            boards[start:stop] = place_fleets(stop - start, size, size, rng=rng)
+
+        tasks = [Task(start, min(start + chunk_games, games), strategy_name, seed, sequential, budget)
+                 for start in range(0, games, chunk_games)]
+        with multiprocessing.Pool(processes, initializer=_attach,
+                                  initargs=(boards_shm.name, results_shm.name, shape)) as pool:
+            for _ in pool.imap_unordered(_play_task, tasks):
+                pass
+        return results.copy()
+    finally:
+        del boards, results  # Release the views before the blocks are closed
+        for shm in (boards_shm, results_shm):
+            shm.close()
+            shm.unlink()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Simulate games across processes with boards in shared memory")
+    parser.add_argument('--games', type=int, default=500_000)
+    parser.add_argument('--size', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--strategies', nargs='+', default=list(BATCH_STRATEGIES))
+    parser.add_argument('--sequential', action='store_true', help="Play registered strategies move by move")
+    parser.add_argument('--budget', type=float, default=0.005, help="Seconds a sequential strategy may think per move")
+    args = parser.parse_args()
+
+    # What a task costs to send, against pickling the boards it covers
+    task_bytes = len(pickle.dumps(Task(0, CHUNK_GAMES, 'hunt_target', args.seed, False, None)))
+    boards = [board_from_ship_ids(ship_ids) for ship_ids in place_fleets(64, args.size, args.size)]
+    board_bytes = len(pickle.dumps(boards)) / len(boards) * CHUNK_GAMES
+    print(f"Per task of {CHUNK_GAMES} games: {task_bytes} bytes sent, pickled Boards would be {board_bytes / 1e6:.1f} MB")
+
+    for name in args.strategies:
+        if name not in (STRATEGIES if args.sequential else BATCH_STRATEGIES):
+            parser.error(f"unknown strategy {name}")
+        start = time.perf_counter()
+        shots = simulate_shared(name, args.games, args.size, args.seed, args.processes,
+                                sequential=args.sequential, budget=args.budget)
+        elapsed = time.perf_counter() - start
+        print(f"{args.size}x{args.size} {name:<12} mean {shots.mean():6.2f} shots   "
+              f"{args.games / elapsed:>10,.0f} games/sec")
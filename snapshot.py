@@ -0,0 +1,151 @@
+import os
+import re
+import struct
+
+import numpy as np
+
+from board import Board, TargetingSystem, PseudoAI, Ship_Classes
+
+SAVE_DIR = 'txt_files/saves'
+MAGIC = b'BSNP'
+VERSION = 1
+
+# magic, version, rows, cols, player tries, ai tries, elapsed, ships sunk (user, ai), ai shot count
+HEADER = struct.Struct('<4sBBBHHdBBH')
+
+def snapshot_path(username, difficulty):
+    safe_name = re.sub(r'[^a-z0-9]+', '_', username.strip().lower()) or 'player'
+    return os.path.join(SAVE_DIR, f"{difficulty.lower()}_{safe_name}.snap")
+
+def _pack_ship_positions(board):
+    # Ship_Classes order is fixed, and every ship has exactly `length` cells
+    cells = [cell for ship in Ship_Classes for cell in board.ship_positions[ship]]
+    return np.asarray(cells, dtype=np.uint8).tobytes()
+
+def _unpack_ship_positions(board, buffer, offset):
+    total = sum(Ship_Classes.values())
+    cells = np.frombuffer(buffer, dtype=np.uint8, count=total * 2, offset=offset).reshape(-1, 2)
+    index = 0
+    for ship, length in Ship_Classes.items():
+        board.ship_positions[ship] = [(int(r), int(c)) for r, c in cells[index:index + length]]
+        index += length
+    return offset + total * 2
+
+def save_snapshot(path, user_board, ai_board, ai, player_tries, elapsed):
+    """
+    Write the full game state as one small binary blob.
+
+    The player's hits and misses are stored implicitly in the 'X' and 'O'
+    cells of the AI board. The AI shots are stored in firing order so the
+    AI can be rebuilt exactly. The file is written to a temp path and
+    renamed, so a crash never leaves a half-written save behind.
+    """
+    rows, cols = user_board.grid.shape
+    parts = [
+        HEADER.pack(MAGIC, VERSION, rows, cols, player_tries, ai.tries, elapsed,
+                    user_board.ships_sunk, ai_board.ships_sunk, len(ai.shot_log)),
+        user_board.grid.astype('S1').tobytes(),
+        ai_board.grid.astype('S1').tobytes(),
+        _pack_ship_positions(user_board),
+        _pack_ship_positions(ai_board),
+        np.asarray(ai.shot_log, dtype=np.uint8).tobytes(),
+    ]
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(b''.join(parts))
+    os.replace(tmp_path, path)
+
+def load_snapshot(path, strategy=None):
+    """
+    Returns (user_board, ai_board, targeting_system, ai, player_tries, elapsed)
+    strategy should be a fresh instance of the strategy the AI was playing with.
+    """
+    with open(path, 'rb') as file:
+        buffer = memoryview(file.read())
+
+    magic, version, rows, cols, player_tries, ai_tries, elapsed, user_sunk, ai_sunk, shot_count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a supported save file")
+    offset = HEADER.size
+
+    boards = []
+    for ships_sunk in (user_sunk, ai_sunk):
+        board = Board(cols, rows)
+        cells = np.frombuffer(buffer, dtype='S1', count=rows * cols, offset=offset)
+        board.grid = cells.reshape(rows, cols).astype('U1')
+        board.ships_sunk = ships_sunk
+        boards.append(board)
+        offset += rows * cols
+    user_board, ai_board = boards
+
+    offset = _unpack_ship_positions(user_board, buffer, offset)
+    offset = _unpack_ship_positions(ai_board, buffer, offset)
+    shots = np.frombuffer(buffer, dtype=np.uint8, count=shot_count * 2, offset=offset).reshape(-1, 2)
+
+    targeting_system = TargetingSystem(ai_board)
+    targeting_system.hits = {(int(r), int(c)) for r, c in zip(*np.nonzero(ai_board.grid == 'X'))}
+    targeting_system.misses = {(int(r), int(c)) for r, c in zip(*np.nonzero(ai_board.grid == 'O'))}
+
+    # Replay the AI's shots so its strategy ends up in the same state
+    ai = PseudoAI(ai_board, user_board, strategy)
+    fired = set()
+    for cell in map(tuple, shots.tolist()):
+        fired.add(cell)
+        ai.shot_log.append(cell)
+        ai.remaining_targets.discard(cell)
+        if user_board.grid[cell] == 'X':
+            ai.hits.add(cell)
+            sunk = None
+            for ship, positions in user_board.ship_positions.items():
+                if cell in positions:
+                    if all(position in fired for position in positions):
+                        sunk = (ship, positions)
+                    break
+            ai.strategy.observe(cell, True, sunk)
+        else:
+            ai.misses.add(cell)
+            ai.strategy.observe(cell, False)
+    ai.tries = ai_tries
+
+    return user_board, ai_board, targeting_system, ai, player_tries, elapsed
+
+def delete_snapshot(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+if __name__ == "__main__":
+
+    # Benchmark a mid-game save/load round trip
+    import tempfile
+    import time
+
+    user_board = Board(7, 7)
+    user_board.place_ships_random()
+    ai_board = Board(7, 7)
+    ai_board.place_ships_random()
+    ai = PseudoAI(ai_board, user_board)
+    for _ in range(20):
+        ai.fire()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bench.snap')
+        runs = 2000
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            save_snapshot(path, user_board, ai_board, ai, 20, 95.5)
+        save_time = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            loaded = load_snapshot(path)
+        load_time = (time.perf_counter() - start) / runs
+
+        assert (loaded[0].grid == user_board.grid).all() and (loaded[1].grid == ai_board.grid).all()
+        assert loaded[3].hits == ai.hits and loaded[3].misses == ai.misses
+        print(f"Snapshot size: {os.path.getsize(path)} bytes")
+        print(f"Save: {save_time * 1e6:.1f} us, Load: {load_time * 1e6:.1f} us")
@@ -0,0 +1,332 @@
+import abc
+import random
+import time
+from collections import Counter
+
+from board import Ship_Classes
+from endgame import get_solver
+
+# Registry of AI targeting strategies, filled in by @register_strategy
+STRATEGIES = {}
+
+# Which strategy each singleplayer difficulty uses
+DIFFICULTY_STRATEGIES = {'Easy': 'random', 'Medium': 'hunt_target', 'Hard': 'endgame'}
+
+# Default per-move thinking time for interactive play, in seconds
+INTERACTIVE_MOVE_BUDGET = 0.05
+
+def register_strategy(name):
+    """Class decorator that makes a strategy selectable by name"""
+    def decorator(cls):
+        if cls.__abstractmethods__:
+            raise TypeError(f"Strategy '{name}' must implement {', '.join(sorted(cls.__abstractmethods__))}")
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+def create_strategy(name, height, width, rng=None):
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown AI strategy '{name}'. Available: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name](height, width, rng)
+
+def strategy_for_difficulty(difficulty, height, width, rng=None):
+    return create_strategy(DIFFICULTY_STRATEGIES.get(difficulty, 'random'), height, width, rng)
+
+class Strategy(abc.ABC):
+    """
+    Base class for AI targeting strategies.
+
+    The AI asks choose() for the next cell, fires at it, then reports the
+    outcome through observe(). A strategy only ever learns what a real
+    player would: hit or miss, and which ship sank (with its cells).
+    """
+
+    name = None
+
+    def __init__(self, height, width, rng=None):
+        self.height = height
+        self.width = width
+        self.rng = rng or random.Random()
+
+    @abc.abstractmethod
+    def choose(self):
+        """Return the (row, col) to fire at next"""
+
+    def decide(self, budget=None):
+        """
+        Anytime version of choose(): return the best move found within
+        budget seconds (None means no time limit). Strategies that search
+        keep refining until the deadline, simple ones just answer at once.
+        """
+        return self.choose()
+
+    @abc.abstractmethod
+    def observe(self, cell, hit, sunk=None):
+        """
+        Record the result of firing at cell.
+        sunk is (ship_name, positions) when the shot sank a ship, else None.
+        """
+
+@register_strategy('random')
+class RandomStrategy(Strategy):
+    """Uniformly random cell that hasn't been fired at yet (the original PseudoAI)"""
+
+    def __init__(self, height, width, rng=None):
+        super().__init__(height, width, rng)
+        self.remaining = [(row, col) for row in range(height) for col in range(width)]
+        self.index = {cell: i for i, cell in enumerate(self.remaining)}
+
+    def choose(self):
+        return self.rng.choice(self.remaining)
+
+    def observe(self, cell, hit, sunk=None):
+        # Swap-remove so both choose() and observe() stay O(1)
+        i = self.index.pop(cell, None)
+        if i is None:
+            return
+        last = self.remaining.pop()
+        if i < len(self.remaining):
+            self.remaining[i] = last
+            self.index[last] = i
+
+@register_strategy('hunt_target')
+class HuntTargetStrategy(Strategy):
+    """
+    Hunt/target search.
+
+    Hunting fires on a checkerboard whose spacing equals the shortest ship
+    still afloat, since every remaining ship must cover one of those cells.
+    After a hit the neighbours go on a target stack, and once two hits line
+    up the cells extending that line are tried first. The stack is cleared
+    when the AI is told a ship sank. choose() never removes anything
+    itself, fired cells are skipped lazily, so each move is amortised O(1).
+    """
+
+    def __init__(self, height, width, rng=None):
+        super().__init__(height, width, rng)
+        self.fired = set()
+        self.remaining_ships = dict(Ship_Classes)
+        self.active_hits = set()  # Hits that don't belong to a sunk ship yet
+        self.targets = []
+        self.parity = None
+        self.hunt_cells = []
+        self._build_hunt_cells()
+
+    def _build_hunt_cells(self):
+        # Only runs when the shortest remaining ship changes, at most once per ship
+        self.parity = min(self.remaining_ships.values(), default=1)
+        self.hunt_cells = [(row, col) for row in range(self.height) for col in range(self.width)
+                           if (row + col) % self.parity == 0 and (row, col) not in self.fired]
+        self.rng.shuffle(self.hunt_cells)
+
+    def _in_bounds(self, cell):
+        return 0 <= cell[0] < self.height and 0 <= cell[1] < self.width
+
+    def _push(self, cell):
+        if self._in_bounds(cell) and cell not in self.fired:
+            self.targets.append(cell)
+
+    def _push_neighbours(self, cell):
+        row, col = cell
+        for d_row, d_col in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            self._push((row + d_row, col + d_col))
+
+    def choose(self):
+        for stack in (self.targets, self.hunt_cells):
+            while stack:
+                if stack[-1] in self.fired:
+                    stack.pop()
+                    continue
+                return stack[-1]
+
+        # Parity cells ran out without finding every ship, fall back to any open cell
+        self.parity = 1
+        self.hunt_cells = [(row, col) for row in range(self.height) for col in range(self.width) if (row, col) not in self.fired]
+        self.rng.shuffle(self.hunt_cells)
+        return self.hunt_cells[-1]
+
+    def observe(self, cell, hit, sunk=None):
+        self.fired.add(cell)
+        if not hit:
+            return
+
+        if sunk:
+            ship_name, positions = sunk
+            self.remaining_ships.pop(ship_name, None)
+            self.active_hits.difference_update(positions)
+            if self.remaining_ships and min(self.remaining_ships.values()) != self.parity:
+                self._build_hunt_cells()
+            # Any hits left over belong to a ship touching the sunk one
+            self.targets = []
+            for active in self.active_hits:
+                self._push_neighbours(active)
+            return
+
+        self.active_hits.add(cell)
+        self._push_neighbours(cell)
+
+        # If this hit lines up with earlier ones, try both ends of the line first
+        row, col = cell
+        for d_row, d_col in ((0, 1), (1, 0)):
+            back = (row - d_row, col - d_col)
+            forward = (row + d_row, col + d_col)
+            if back not in self.active_hits and forward not in self.active_hits:
+                continue
+            start = cell
+            while (start[0] - d_row, start[1] - d_col) in self.active_hits:
+                start = (start[0] - d_row, start[1] - d_col)
+            end = cell
+            while (end[0] + d_row, end[1] + d_col) in self.active_hits:
+                end = (end[0] + d_row, end[1] + d_col)
+            self._push((start[0] - d_row, start[1] - d_col))
+            self._push((end[0] + d_row, end[1] + d_col))
+
+@register_strategy('probability')
+class ProbabilityStrategy(Strategy):
+    """
+    Anytime probability-density search.
+
+    It first counts, for every open cell, how many placements of each
+    remaining ship could cover it. Placements through unresolved hits get
+    extra weight. That answer is always ready straight away. Until the
+    deadline it then samples whole fleet layouts that fit everything seen
+    so far and fires at the cell covered most often.
+    """
+
+    HIT_WEIGHT = 20
+    MIN_SAMPLES = 50
+    MAX_SAMPLES = 4000
+
+    def __init__(self, height, width, rng=None):
+        super().__init__(height, width, rng)
+        self.fired = set()
+        self.blocked = set()  # Misses and cells of sunk ships
+        self.active_hits = set()
+        self.remaining_ships = dict(Ship_Classes)
+        self.placements = {length: self._all_placements(length) for length in set(Ship_Classes.values())}
+        self.samples_taken = 0  # Joint samples used for the last decision
+
+    def _all_placements(self, length):
+        placements = []
+        for row in range(self.height):
+            for col in range(self.width):
+                if col + length <= self.width:
+                    placements.append(tuple((row, col + i) for i in range(length)))
+                if row + length <= self.height:
+                    placements.append(tuple((row + i, col) for i in range(length)))
+        return placements
+
+    def _valid_placements(self):
+        return {name: [p for p in self.placements[length] if self.blocked.isdisjoint(p)]
+                for name, length in self.remaining_ships.items()}
+
+    def _best_cell(self, counts):
+        open_counts = {cell: count for cell, count in counts.items() if cell not in self.fired}
+        if not open_counts:
+            return None
+        best = max(open_counts.values())
+        return self.rng.choice([cell for cell, count in open_counts.items() if count == best])
+
+    def _density(self, valid):
+        counts = Counter()
+        for placements in valid.values():
+            for placement in placements:
+                weight = 1 + self.HIT_WEIGHT * len(self.active_hits.intersection(placement))
+                for cell in placement:
+                    counts[cell] += weight
+        return counts
+
+    def _sample_layout(self, valid):
+        """One random layout of the remaining ships that covers every unresolved hit, or None"""
+        occupied = set()
+        for name in self.rng.sample(list(valid), len(valid)):
+            options = valid[name]
+            for _ in range(10):
+                placement = self.rng.choice(options) if options else None
+                if placement is not None and occupied.isdisjoint(placement):
+                    occupied.update(placement)
+                    break
+            else:
+                return None
+        return occupied if self.active_hits <= occupied else None
+
+    def choose(self):
+        return self.decide(INTERACTIVE_MOVE_BUDGET)
+
+    def decide(self, budget=None):
+        deadline = None if budget is None else time.perf_counter() + budget
+        valid = self._valid_placements()
+        best = self._best_cell(self._density(valid))
+
+        joint = Counter()
+        samples = attempts = 0
+        while samples < self.MAX_SAMPLES and attempts < self.MAX_SAMPLES * 20:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            attempts += 1
+            layout = self._sample_layout(valid)
+            if layout is None:
+                continue
+            joint.update(layout)
+            samples += 1
+
+        self.samples_taken = samples
+        if samples >= self.MIN_SAMPLES:
+            best = self._best_cell(joint) or best
+        if best is None:
+            best = self.rng.choice([(row, col) for row in range(self.height) for col in range(self.width)
+                                    if (row, col) not in self.fired])
+        return best
+
+    def observe(self, cell, hit, sunk=None):
+        self.fired.add(cell)
+        if not hit:
+            self.blocked.add(cell)
+            return
+        self.active_hits.add(cell)
+        if sunk:
+            ship_name, positions = sunk
+            self.remaining_ships.pop(ship_name, None)
+            self.active_hits.difference_update(positions)
+            self.blocked.update(positions)
+
+@register_strategy('endgame')
+class EndgameStrategy(ProbabilityStrategy):
+    """
+    Probability search that plays the endgame perfectly.
+
+    Once few enough fleet layouts fit what has been seen, the shared
+    endgame.EndgameSolver picks the shot with the fewest expected shots
+    left, whenever it can prove it within half the move's budget. Its
+    transposition table lives in the solver rather than on the strategy,
+    so it carries over between turns and games.
+    """
+
+    SOLVE_SHARE = 0.5  # Part of the move budget the exact solver may use, the fallback keeps the rest
+
+    def __init__(self, height, width, rng=None):
+        super().__init__(height, width, rng)
+        self.misses = set()
+        self.sunk = {}  # ship_name -> positions
+        self.solved_moves = 0  # Moves answered by the exact solver
+
+    def decide(self, budget=None):
+        start = time.perf_counter()
+        solver = get_solver(self.height, self.width, Ship_Classes)
+        solve_budget = None if budget is None else budget * self.SOLVE_SHARE
+        solved = solver.best_shot(self.remaining_ships, self.misses, self.active_hits, self.sunk, solve_budget)
+        if solved is None:
+            # Too open, or not solved in time: fall back on the sampled density with the rest of the budget
+            left = None if budget is None else max(budget - (time.perf_counter() - start), 0.0)
+            return super().decide(left)
+        self.solved_moves += 1
+        return solved[0]
+
+    def observe(self, cell, hit, sunk=None):
+        super().observe(cell, hit, sunk)
+        if not hit:
+            self.misses.add(cell)
+        elif sunk:
+            ship_name, positions = sunk
+            self.sunk[ship_name] = list(positions)
@@ -0,0 +1,71 @@
+import argparse
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from board import Board, PseudoAI
+from strategies import STRATEGIES, create_strategy
+
+def play_out(strategy_name, seed, size, budget=None):
+    """
+    Let one strategy fire at the board generated from seed until every ship
+    is sunk, thinking for at most budget seconds per move.
+    Returns (shots to win, per-move latencies in seconds).
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    target_board = Board(size, size)
+    target_board.place_ships_random()
+
+    strategy = create_strategy(strategy_name, size, size, random.Random(seed))
+    ai = PseudoAI(Board(size, size), target_board, strategy, budget)
+    while not ai.game_over:
+        ai.fire()
+    return ai.tries, ai.move_times
+
+def play_chunk(args):
+    strategy_name, seeds, size, budget = args
+    shots = np.empty(len(seeds), dtype=np.int16)
+    latencies = []
+    for i, seed in enumerate(seeds):
+        shots[i], move_latencies = play_out(strategy_name, seed, size, budget)
+        latencies.extend(move_latencies)
+    return shots, np.asarray(latencies, dtype=np.float32)
+
+def compare_strategies(strategy_names, games, size, base_seed=0, processes=None, chunk_size=500, budget=None):
+    """Play every strategy against the same seeded boards, returns {name: (shots, latencies)}"""
+    results = {}
+    with multiprocessing.Pool(processes) as pool:
+        for name in strategy_names:
+            chunks = [(name, range(base_seed + start, base_seed + min(start + chunk_size, games)), size, budget)
+                      for start in range(0, games, chunk_size)]
+            parts = pool.map(play_chunk, chunks)
+            results[name] = (np.concatenate([part[0] for part in parts]), np.concatenate([part[1] for part in parts]))
+    return results
+
+def print_report(results, size, games):
+    print(f"{games} games on {size}x{size} boards")
+    print(f"{'Strategy':<14}{'mean':>8}{'p50':>6}{'p90':>6}{'p99':>6}{'max':>6}   {'move mean':>10}{'move p99':>10}")
+    for name, (shots, latencies) in results.items():
+        p50, p90, p99 = np.percentile(shots, [50, 90, 99])
+        lat_mean = latencies.mean() * 1e6
+        lat_p99 = np.percentile(latencies, 99) * 1e6
+        print(f"{name:<14}{shots.mean():>8.2f}{p50:>6.0f}{p90:>6.0f}{p99:>6.0f}{shots.max():>6}   {lat_mean:>8.1f}us{lat_p99:>8.1f}us")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compare registered AI strategies on the same seeded boards")
+    parser.add_argument('--games', type=int, default=100_000)
+    parser.add_argument('--size', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES))
+    parser.add_argument('--budget', type=float, default=0.005, help="Seconds each anytime strategy may think per move")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = compare_strategies(args.strategies, args.games, args.size, args.seed, args.processes, budget=args.budget)
+    print_report(results, args.size, args.games)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,114 @@
+import os
+import shutil
+import signal
+import threading
+import time
+
+RESIZE_DEBOUNCE = 0.15  # Seconds without further SIGWINCH before a resize is acted on
+FALLBACK_SIZE = (80, 20)
+
+class TerminalGeometry:
+    """
+    The terminal size, cached until the terminal is actually resized.
+
+    SIGWINCH only records that a resize happened and pokes a wake-up pipe,
+    so a select() loop (see KeySession) notices it straight away. A burst
+    of signals while a window edge is dragged is coalesced: the new size
+    is only read, and take_resize() only reports it, once no signal has
+    arrived for RESIZE_DEBOUNCE seconds.
+    """
+
+    def __init__(self, debounce=RESIZE_DEBOUNCE):
+        self.debounce = debounce
+        self.size = shutil.get_terminal_size(FALLBACK_SIZE)
+        self.pending = False  # A resize was signalled but hasn't settled yet
+        self.changed = False  # The size changed since take_resize() last said so
+        self.last_signal = 0.0
+        self.wake_fd = None
+        self._wake_write = None
+
+        # Signal handlers can only be installed from the main thread, elsewhere the size just stays cached
+        if hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+            self.wake_fd, self._wake_write = os.pipe()
+            os.set_blocking(self.wake_fd, False)
+            os.set_blocking(self._wake_write, False)
+            signal.signal(signal.SIGWINCH, self._on_resize)
+
+    def _on_resize(self, signum, frame):
+        self.last_signal = time.monotonic()
+        self.pending = True
+        try:
+            os.write(self._wake_write, b'w')
+        except BlockingIOError:
+            pass  # The pipe is already full of wake-ups
+
+    def _settle(self):
+        # Re-read the size once the last burst of resizes has gone quiet
+        if self.pending and time.monotonic() - self.last_signal >= self.debounce:
+            self.pending = False
+            size = shutil.get_terminal_size(FALLBACK_SIZE)
+            self.changed = self.changed or size != self.size
+            self.size = size
+
+    def current_size(self):
+        """The cached os.terminal_size, re-read only after a settled resize"""
+        self._settle()
+        return self.size
+
+    @property
+    def columns(self):
+        return self.current_size().columns
+
+    @property
+    def lines(self):
+        return self.current_size().lines
+
+    def drain_wakeups(self):
+        if self.wake_fd is None:
+            return
+        try:
+            while os.read(self.wake_fd, 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def resize_timeout(self):
+        """How long a select() may block before a pending resize settles (None = nothing pending)"""
+        if not self.pending:
+            return None
+        return max(self.last_signal + self.debounce - time.monotonic(), 0.0)
+
+    def take_resize(self):
+        """True once per settled burst of resizes that actually changed the size"""
+        self._settle()
+        changed, self.changed = self.changed, False
+        return changed
+
+_geometry = None
+
+def terminal_geometry():
+    """The process-wide cached geometry, listening for resizes from first use"""
+    global _geometry
+    if _geometry is None:
+        _geometry = TerminalGeometry()
+    return _geometry
+
+if __name__ == "__main__":
+
+    # Usage example: drag the window edge, one line is printed per settled resize
+    import select
+
+    geometry = terminal_geometry()
+    print(f"{geometry.columns}x{geometry.lines}, resize the terminal (Ctrl+C to stop)")
+    wakeups = 0
+    try:
+        while True:
+            ready, _, _ = select.select([geometry.wake_fd], [], [], geometry.resize_timeout())
+            if ready:
+                geometry.drain_wakeups()
+                wakeups += 1
+            if geometry.take_resize():
+                print(f"{geometry.columns}x{geometry.lines} after {wakeups} wake-ups")
+                wakeups = 0
+    except KeyboardInterrupt:
+        pass
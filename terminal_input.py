@@ -0,0 +1,113 @@
+import os
+import select
+import sys
+import termios
+import tty
+
+ESC = b'\x1b'
+ESC_TIMEOUT = 0.05  # How long to wait for the rest of an escape sequence
+
+class KeySession:
+    """
+    Keeps the terminal in raw mode for as long as a menu is open.
+
+    Keys are read with select() and os.read(), so a held-down arrow key
+    that delivers many escape sequences in one read becomes many keys
+    rather than a lag or leaked characters. Escape sequences are parsed
+    incrementally and may be split across reads.
+    Keys are returned in the same form the menus already use ('\\x1b[A', '\\r', 'q').
+    A wake_fd (e.g. TerminalGeometry's resize pipe) also ends a wait, with no keys.
+    """
+
+    def __init__(self, stream=None, wake_fd=None):
+        self.stream = stream or sys.stdin
+        self.fd = self.stream.fileno()
+        self.wake_fd = wake_fd
+        self.pending = b''
+        self.old_settings = None
+
+    def __enter__(self):
+        self.old_settings = termios.tcgetattr(self.fd)
+        tty.setraw(self.fd)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_settings)
+
+    @staticmethod
+    def write(text):
+        # Raw mode turns off output processing, so newlines need an explicit carriage return
+        sys.stdout.write(text.replace("\n", "\r\n"))
+        sys.stdout.flush()
+
+    def _fill(self, timeout):
+        watched = [self.fd] if self.wake_fd is None else [self.fd, self.wake_fd]
+        ready, _, _ = select.select(watched, [], [], timeout)
+        if self.wake_fd in ready:
+            try:
+                os.read(self.wake_fd, 1024)
+            except BlockingIOError:
+                pass
+        if self.fd not in ready:
+            return False
+        data = os.read(self.fd, 1024)
+        self.pending += data
+        return bool(data)
+
+    def _parse(self, final):
+        """Split complete keys off the front of the buffer"""
+        keys = []
+        while self.pending:
+            if self.pending.startswith(ESC):
+                if len(self.pending) == 1:
+                    if not final:
+                        break  # Maybe the start of a sequence, wait for more
+                    keys.append('\x1b')
+                    self.pending = b''
+                    break
+                if self.pending[1:2] in (b'[', b'O'):
+                    # CSI/SS3: parameters, then a final byte in 0x40-0x7E
+                    end = next((i for i in range(2, len(self.pending)) if 0x40 <= self.pending[i] <= 0x7E), None)
+                    if end is None:
+                        if not final:
+                            break
+                        end = len(self.pending) - 1
+                    keys.append(self.pending[:end + 1].decode(errors='replace'))
+                    self.pending = self.pending[end + 1:]
+                    continue
+                keys.append('\x1b')
+                self.pending = self.pending[1:]
+                continue
+
+            # Plain characters, keeping multibyte UTF-8 together
+            length = 1
+            first = self.pending[0]
+            if first >= 0xF0:
+                length = 4
+            elif first >= 0xE0:
+                length = 3
+            elif first >= 0xC0:
+                length = 2
+            if len(self.pending) < length and not final:
+                break
+            keys.append(self.pending[:length].decode(errors='replace'))
+            self.pending = self.pending[length:]
+        return keys
+
+    def read_keys(self, timeout=None):
+        """
+        Block until at least one key arrives (or timeout seconds pass) and
+        return every complete key that is available right now.
+        """
+        if not self.pending and not self._fill(timeout):
+            return []
+        # Drain whatever else is already queued so repeats are handled as one batch
+        while self._fill(0):
+            pass
+
+        keys = self._parse(final=False)
+        if self.pending and not keys:
+            # Half an escape sequence: give the rest a moment to arrive
+            self._fill(ESC_TIMEOUT)
+            keys = self._parse(final=True)
+        return keys
@@ -0,0 +1,92 @@
+import ast
+import bisect
+import re
+from collections import deque
+from datetime import datetime, timedelta
+
+from history import history_replaced, read_lines_from
+from leaderboard import time_to_seconds
+
+DATE_FORMAT = "%d-%m-%Y %H:%M:%S"
+WINDOWS = {'Daily': timedelta(days=1), 'Weekly': timedelta(days=7), 'Monthly': timedelta(days=30)}
+
+class WindowedLeaderboard:
+    """
+    Leaderboard over the games of the last `window` of time, for one history file.
+
+    New records are read by tailing the file from the last offset seen,
+    and records that have aged out are evicted from the front of a
+    time-ordered deque. Nothing is ever rescanned. The ranking is a list
+    kept sorted by (shots, seconds), so both inserts and evictions are a
+    bisect away.
+    """
+
+    def __init__(self, history_path, window):
+        self.history_path = history_path
+        self.window = window
+        self.entries = deque()  # (timestamp, ranking entry), oldest first
+        self.ranking = []  # (shots, seconds, sequence number, record), best first
+        self.offset = 0
+        self.sequence = 0
+        self.history_id = None
+
+    def _add(self, record, now):
+        timestamp = datetime.strptime(record[1], DATE_FORMAT)
+        if timestamp < now - self.window:
+            return  # Already too old to ever show up
+        entry = (record[5], time_to_seconds(record[4]), self.sequence, record)
+        self.sequence += 1
+        bisect.insort(self.ranking, entry)
+        if self.entries and timestamp < self.entries[-1][0]:
+            bisect.insort(self.entries, (timestamp, entry))  # Rare: another process wrote out of order
+        else:
+            self.entries.append((timestamp, entry))
+
+    def _evict(self, now):
+        cutoff = now - self.window
+        while self.entries and self.entries[0][0] < cutoff:
+            _, entry = self.entries.popleft()
+            del self.ranking[bisect.bisect_left(self.ranking, entry)]
+
+    def refresh(self, now=None):
+        now = now or datetime.now()
+        if history_replaced(self):
+            self.entries.clear()
+            self.ranking = []
+            self.offset = 0
+        for _, end, line in read_lines_from(self.history_path, self.offset):
+            self.offset = end
+            try:
+                record = ast.literal_eval(line.strip())
+                if record[2] is None:
+                    continue  # Unfinished game
+                self._add(record, now)
+            except Exception:
+                continue
+        self._evict(now)
+
+    def top(self, count=10):
+        return [entry[3] for entry in self.ranking[:count]]
+
+_leaderboards = {}
+
+def get_windowed_leaderboard(history_path, window_name):
+    key = (history_path, window_name)
+    if key not in _leaderboards:
+        _leaderboards[key] = WindowedLeaderboard(history_path, WINDOWS[window_name])
+    leaderboard = _leaderboards[key]
+    leaderboard.refresh()
+    return leaderboard
+
+def print_windowed_leaderboard(history_path, window_name, count=10):
+    pattern = re.compile(r"[\'\[\]]")
+    records = get_windowed_leaderboard(history_path, window_name).top(count)
+    if not records:
+        print("No games in this period.")
+    for idx, record in enumerate(records):
+        print(f"{idx+1}. {pattern.sub('', str(record))}")
+
+if __name__ == "__main__":
+
+    # Usage example
+    print_windowed_leaderboard('txt_files/easy_game_history.txt', 'Monthly')